@@ -0,0 +1,694 @@
+import os
+import sys
+import io
+import json
+import time
+import random
+import argparse
+import statistics
+import subprocess
+import tempfile
+import threading
+import contextlib
+import tracemalloc
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse
+
+from inventory_checker import InventoryChecker, InventoryColumns
+
+# Methods of InventoryChecker that are timed as benchmark stages.
+# Times are inclusive, so a browser restart inside a page load counts twice.
+TIMED_STAGES = [
+    'extract_pdf_data',
+    'learn_url_patterns',
+    'setup_selenium',
+    'get_producer_products',
+    'check_product_details',
+    'predict_url_from_pattern',
+    'generate_excel_report',
+]
+
+# Differences smaller than this are treated as noise when comparing runs
+MIN_TIME_DELTA = 0.05
+
+ASSET_BUTTONS = [
+    ('spec-sheet.pdf', 'Spec Sheet'),
+    ('shelf-talker.pdf', 'Shelf-Talker'),
+    ('hi-res-label.png', 'Hi-Res Label'),
+    ('bottle-shot.png', 'Bottle Shot'),
+]
+
+
+class StandInSite:
+    """In-process HTTP server imitating the Southern Starz catalog
+
+    Producer pages, product pages and asset links are generated from the
+    checker's own producer and SKU mappings, so every mapped URL resolves.
+    Latency and error rate are applied to every request.
+    """
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, asset_coverage=0.8, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.asset_coverage = asset_coverage
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.stats = Counter()
+        self.stats_lock = threading.Lock()
+        self.server = None
+        self.thread = None
+        self.base_url = None
+        self.build_catalog()
+
+    def build_catalog(self):
+        """Build producer listings and product pages from the checker's mappings"""
+        checker = InventoryChecker()
+        self.live_base_url = checker.base_url
+        self.producer_pages = {}  # producer page path -> (producer, [product slugs])
+        self.products = {}  # product slug -> title
+
+        slugs = sorted({
+            url.rstrip('/').rsplit('/', 1)[-1]
+            for url in checker.sku_url_mapping.values()
+            if url and url != 'NO_MATCH'
+        })
+
+        for producer in checker.producers:
+            page_url = checker.get_producer_page_url(producer)
+            if not page_url:
+                continue
+            prefix = producer.split()[0].lower()
+            producer_slugs = [slug for slug in slugs if slug.startswith(prefix)]
+            # One listing per producer that is not in any inventory
+            producer_slugs.append(f"{prefix}-library-release-2015")
+            path = urlparse(page_url).path
+            self.producer_pages[path] = (producer, producer_slugs)
+            for slug in producer_slugs:
+                self.products[slug] = slug.replace('-', ' ').title()
+
+    def has_asset(self, slug, asset):
+        """Decide deterministically whether a product page links an asset"""
+        return random.Random(f"{slug}/{asset}").random() < self.asset_coverage
+
+    def producer_page(self, path):
+        producer, product_slugs = self.producer_pages[path]
+        cards = []
+        for slug in product_slugs:
+            cards.append(
+                '<article type-wines>'
+                f'<h2 class="elementor-heading-title">{self.products[slug]}</h2>'
+                f'<div class="elementor-button-wrapper"><a href="/wines/{slug}/">View Wine</a></div>'
+                '</article>'
+            )
+        return f"<html><head><title>{producer} Wines</title></head><body>{''.join(cards)}</body></html>"
+
+    def product_page(self, slug):
+        buttons = []
+        for asset, label in ASSET_BUTTONS:
+            if self.has_asset(slug, asset):
+                buttons.append(
+                    f'<div class="elementor-button-wrapper"><a href="/assets/{slug}/{asset}">{label}</a></div>'
+                )
+        return (
+            f"<html><head><title>{self.products[slug]}</title></head><body>"
+            f'<h1 class="elementor-heading-title">{self.products[slug]}</h1>{"".join(buttons)}</body></html>'
+        )
+
+    def resolve(self, path):
+        """Return (status, kind, body) for a request path"""
+        if path in self.producer_pages:
+            return 200, 'producer', self.producer_page(path)
+
+        parts = [part for part in path.split('/') if part]
+        if len(parts) == 2 and parts[0] == 'wines' and parts[1] in self.products:
+            return 200, 'product', self.product_page(parts[1])
+        if len(parts) == 3 and parts[0] == 'assets' and parts[1] in self.products:
+            return 200, 'asset', 'asset'
+        return 404, 'other', '<html><body>Not found</body></html>'
+
+    def record(self, kind, method, status):
+        with self.stats_lock:
+            self.stats['requests'] += 1
+            self.stats[f"{kind}_requests"] += 1
+            self.stats[f"{method.lower()}_requests"] += 1
+            if status >= 400:
+                self.stats['errors'] += 1
+
+    def delay(self):
+        """Sleep for the configured latency and decide whether to fail the request"""
+        with self.random_lock:
+            wait = self.latency + self.random.uniform(0, self.jitter)
+            failed = self.random.random() < self.error_rate
+        if wait:
+            time.sleep(wait)
+        return failed
+
+    def make_handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def respond(self, send_body):
+                path = urlparse(self.path).path
+                status, kind, body = site.resolve(path)
+                if site.delay():
+                    status, body = 503, '<html><body>Service unavailable</body></html>'
+                site.record(kind, self.command, status)
+
+                payload = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(payload)
+
+            def do_GET(self):
+                self.respond(True)
+
+            def do_HEAD(self):
+                self.respond(False)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self, port=0):
+        """Start serving in a background thread and return the base URL"""
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self.make_handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        return self.base_url
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.stats.clear()
+
+    def point_checker(self, checker):
+        """Redirect a checker's base URL and SKU mappings to this site"""
+        checker.base_url = self.base_url
+        checker.sku_url_mapping = {
+            sku: url.replace(self.live_base_url, self.base_url)
+            for sku, url in checker.sku_url_mapping.items()
+        }
+
+
+class TimedInventoryChecker(InventoryChecker):
+    """InventoryChecker that records wall time and call counts per stage"""
+    def __init__(self):
+        super().__init__()
+        self.stage_times = Counter()
+        self.stage_calls = Counter()
+        for name in TIMED_STAGES:
+            setattr(self, name, self.timed(name, getattr(self, name)))
+
+    def timed(self, name, method):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.stage_times[name] += time.perf_counter() - start
+                self.stage_calls[name] += 1
+        return wrapper
+
+
+@contextlib.contextmanager
+def working_directory(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def run_once(pdf_path, site, verbose=False):
+    """Run process_inventory end to end against the stand-in site"""
+    pdf_path = os.path.abspath(pdf_path)
+    checker = TimedInventoryChecker()
+    site.point_checker(checker)
+    site.reset_stats()
+
+    log = io.StringIO()
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(log)
+
+    with tempfile.TemporaryDirectory() as workdir, working_directory(workdir), output:
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            success = checker.process_inventory(pdf_path)
+        finally:
+            wall_time = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+    return {
+        'pdf': os.path.basename(pdf_path),
+        'success': bool(success),
+        'wall_time': wall_time,
+        'peak_memory_mb': peak / (1024 * 1024),
+        'stages': {name: checker.stage_times[name] for name in TIMED_STAGES},
+        'calls': {name: checker.stage_calls[name] for name in TIMED_STAGES},
+        'requests': dict(site.stats),
+    }
+
+
+def print_result(result):
+    status = "ok" if result['success'] else "FAILED"
+    print(f"\n{result['pdf']} ({status})")
+    print(f"  Wall time:   {result['wall_time']:.2f}s")
+    print(f"  Peak memory: {result['peak_memory_mb']:.1f} MB (Python heap)")
+    print(f"  Requests:    {result['requests'].get('requests', 0)} "
+          f"(producer {result['requests'].get('producer_requests', 0)}, "
+          f"product {result['requests'].get('product_requests', 0)}, "
+          f"errors {result['requests'].get('errors', 0)})")
+    print("  Stages:")
+    for name in TIMED_STAGES:
+        calls = result['calls'][name]
+        if calls:
+            print(f"    {name:<28} {result['stages'][name]:8.2f}s  ({calls} calls)")
+
+
+def compare_results(results, baseline, tolerance):
+    """Compare results against a baseline file and return a list of regressions"""
+    baseline_runs = {run['pdf']: run for run in baseline.get('runs', [])}
+    regressions = []
+
+    def check(pdf, metric, current, previous, min_delta):
+        if previous is None:
+            return
+        if current > previous * (1 + tolerance) and current - previous > min_delta:
+            regressions.append((pdf, metric, previous, current))
+
+    for result in results:
+        previous = baseline_runs.get(result['pdf'])
+        if not previous:
+            print(f"No baseline for {result['pdf']}, skipping comparison")
+            continue
+        check(result['pdf'], 'wall_time', result['wall_time'], previous.get('wall_time'), MIN_TIME_DELTA)
+        check(result['pdf'], 'peak_memory_mb', result['peak_memory_mb'], previous.get('peak_memory_mb'), 1.0)
+        check(result['pdf'], 'requests', result['requests'].get('requests', 0),
+              previous.get('requests', {}).get('requests'), 0)
+        for name in TIMED_STAGES:
+            check(result['pdf'], name, result['stages'][name],
+                  previous.get('stages', {}).get(name), MIN_TIME_DELTA)
+
+    return regressions
+
+
+def default_pdfs():
+    data_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+    return sorted(
+        os.path.join(data_dir, name) for name in os.listdir(data_dir)
+        if name.lower().endswith('.pdf')
+    )
+
+
+def make_site(args):
+    return StandInSite(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        asset_coverage=args.asset_coverage,
+        seed=args.seed,
+    )
+
+
+def command_run(args):
+    pdfs = args.pdfs or default_pdfs()
+    site = make_site(args)
+    base_url = site.start()
+    print(f"Stand-in site running at {base_url}")
+
+    results = []
+    try:
+        for pdf_path in pdfs:
+            for _ in range(args.runs):
+                result = run_once(pdf_path, site, verbose=args.verbose)
+                print_result(result)
+                results.append(result)
+    finally:
+        site.stop()
+
+    report = {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'settings': {
+            'latency': args.latency,
+            'jitter': args.jitter,
+            'error_rate': args.error_rate,
+            'asset_coverage': args.asset_coverage,
+            'seed': args.seed,
+        },
+        'runs': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nRegressions against {args.baseline}:")
+            for pdf, metric, previous, current in regressions:
+                print(f"  {pdf} {metric}: {previous:.2f} -> {current:.2f}")
+            return 1
+        print(f"\nNo regressions against {args.baseline}")
+
+    return 0 if all(result['success'] for result in results) else 1
+
+
+def command_startup(args):
+    """Launch the GUI in startup-check mode and compare its startup time to a budget"""
+    gui_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'inventory_gui.py')
+    window_times = []
+    process_times = []
+    heavy_loaded = set()
+
+    for run in range(args.runs):
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, gui_path, '--startup-check'],
+            capture_output=True, text=True, timeout=120
+        )
+        process_times.append(time.perf_counter() - start)
+
+        lines = [line for line in completed.stdout.splitlines() if line.startswith('STARTUP ')]
+        if not lines:
+            print(f"Run {run + 1}: the GUI did not report its startup time")
+            print(completed.stdout + completed.stderr)
+            return 1
+        report = json.loads(lines[-1][len('STARTUP '):])
+        window_times.append(report['time_to_window'])
+        heavy_loaded.update(report['heavy_modules_loaded'])
+        print(f"Run {run + 1}: window after {report['time_to_window']:.2f}s, process exited after {process_times[-1]:.2f}s")
+
+    # The process time includes interpreter startup, which the in-process timer cannot see
+    median_window = statistics.median(window_times)
+    median_process = statistics.median(process_times)
+    print(f"\nMedian time to first window: {median_window:.2f}s (whole process {median_process:.2f}s, budget {args.budget:.2f}s)")
+
+    failed = False
+    if median_window > args.budget:
+        print(f"FAIL: time to first window is over budget by {median_window - args.budget:.2f}s")
+        failed = True
+    if heavy_loaded:
+        print(f"FAIL: heavy modules loaded before the window appeared: {', '.join(sorted(heavy_loaded))}")
+        failed = True
+    if not failed:
+        print("OK: startup is within budget")
+    return 1 if failed else 0
+
+
+def synthetic_inventory_lines(checker, rows, seed=0):
+    """Inventory lines shaped like the PDF text, drawn from the checker's producers"""
+    rng = random.Random(seed)
+    vintages = [str(year) for year in range(2015, 2025)] + ['N/V']
+    wines = ['CABERNET SAUVIGNON', 'CHARDONNAY', 'PINOT NOIR', 'SAUVIGNON BLANC', 'ROSE', 'MERLOT', 'SYRAH']
+    lines = []
+    for number in range(rows):
+        on_hand = rng.randint(0, 500)
+        on_order = rng.randint(0, min(on_hand, 100))
+        lines.append(
+            f"S{number:06d} {rng.choice(vintages)} {rng.choice(checker.producers)} {rng.choice(wines)} 750ML "
+            f"{on_hand:,}/00 {on_order:,}/00 {on_hand - on_order:,}/00"
+        )
+    return lines
+
+
+def measure_memory(build):
+    """Return (result, peak Python heap in MB) for build()"""
+    tracemalloc.start()
+    try:
+        result = build()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak / (1024 * 1024)
+
+
+def command_memory(args):
+    """Compare the memory of dict-per-row and column-oriented inventory extraction"""
+    import pandas as pd
+    checker = InventoryChecker()
+    lines = synthetic_inventory_lines(checker, args.rows, args.seed)
+    print(f"Parsing {len(lines)} synthetic inventory lines")
+
+    def build_dicts():
+        # One dict per line and object columns, as extract_pdf_data used to do
+        rows = InventoryColumns()
+        checker.parse_inventory_lines(lines, rows)
+        data = [
+            {
+                'SKU': sku, 'Vintage': vintage, 'Producer': producer, 'Product': product,
+                'Full Description': description, 'On Hand': str(on_hand), 'On Order': str(on_order),
+                'Available': str(available), 'On Website': False, 'Has Spec Sheet': False,
+                'Has Shelf-Talker': False, 'Has Hi-Res Label': False, 'Has Bottle Shot': False,
+                'Product URL': '', 'Varietal Mismatch': False
+            }
+            for sku, vintage, producer, product, description, on_hand, on_order, available in zip(
+                rows.sku, rows.vintage, rows.producer, rows.product, rows.description,
+                rows.on_hand, rows.on_order, rows.available
+            )
+        ]
+        del rows
+        return pd.DataFrame(data)
+
+    def build_columns():
+        rows = InventoryColumns()
+        checker.parse_inventory_lines(lines, rows)
+        return rows.to_dataframe()
+
+    results = []
+    for name, build in (('dict per row', build_dicts), ('typed columns', build_columns)):
+        df, peak = measure_memory(build)
+        frame_mb = df.memory_usage(deep=True).sum() / (1024 * 1024)
+        results.append({'layout': name, 'rows': len(df), 'peak_memory_mb': peak, 'dataframe_mb': frame_mb})
+        print(f"  {name:<14} peak {peak:8.1f} MB   DataFrame {frame_mb:8.1f} MB")
+        del df
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'rows': args.rows, 'results': results}, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+    return 0
+
+
+def write_synthetic_pdf(path, checker, pages, lines_per_page=70, seed=0):
+    """Write a text-only inventory PDF by hand, so no PDF library is needed"""
+    lines = synthetic_inventory_lines(checker, pages * lines_per_page, seed)
+    offsets = []
+
+    def escape(text):
+        return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+    with open(path, 'wb') as f:
+        def write_object(body):
+            offsets.append(f.tell())
+            f.write(f"{len(offsets)} 0 obj\n".encode('latin-1') + body + b"\nendobj\n")
+
+        f.write(b"%PDF-1.4\n")
+        kids = ' '.join(f"{4 + 2 * page} 0 R" for page in range(pages))
+        write_object(b"<< /Type /Catalog /Pages 2 0 R >>")
+        write_object(f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode('latin-1'))
+        write_object(b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier >>")
+        for page in range(pages):
+            # Fixed-width columns in Courier, laid out like the warehouse report
+            page_lines = [
+                f"AMS REPORT INR134 SYNTHETIC WAREHOUSE PAGE {page + 1}",
+                "RUN 01/01/25 SIMPLIFIED STOCK STATUS REPORT",
+                ' ' * 21 + 'DESCRIPTION'.ljust(66) + 'ON HAND' + '  ON ORDER'.rjust(12) + 'AVAILABLE'.rjust(12),
+            ]
+            for line in lines[page * lines_per_page:(page + 1) * lines_per_page]:
+                parts = line.split()
+                page_lines.append(
+                    parts[0].ljust(21) + ' '.join(parts[1:-3])[:65].ljust(66)
+                    + parts[-3].rjust(9) + parts[-2].rjust(12) + parts[-1].rjust(12)
+                )
+            stream = "BT /F1 8.36 Tf 10.5 TL 5 770 Td " + ' '.join(f"({escape(line)}) Tj T*" for line in page_lines) + " ET"
+            stream = stream.encode('latin-1')
+            write_object(
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * page} 0 R >>".encode('latin-1')
+            )
+            write_object(f"<< /Length {len(stream)} >>\nstream\n".encode('latin-1') + stream + b"\nendstream")
+
+        xref = f.tell()
+        f.write(f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n".encode('latin-1'))
+        for offset in offsets:
+            f.write(f"{offset:010d} 00000 n \n".encode('latin-1'))
+        f.write(f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('latin-1'))
+
+
+def peak_rss_mb():
+    """Peak resident memory of this process, or None where it cannot be read"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def extract_keeping_pages(checker, pdf_path):
+    """Extraction as it was before pages were released: pdfplumber keeps every page's layout"""
+    import pdfplumber
+    rows = InventoryColumns()
+    with pdfplumber.open(pdf_path) as pdf:
+        for page in pdf.pages:
+            checker.parse_inventory_lines((page.extract_text() or '').split('\n'), rows)
+        return rows.to_dataframe()
+
+
+def command_extract_once(args):
+    """Extract one PDF and print its memory use as JSON (run by 'extract' in a fresh process)"""
+    checker = InventoryChecker()
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        if args.mode == 'before':
+            df = extract_keeping_pages(checker, args.pdf)
+        else:
+            df = checker.extract_pdf_data(args.pdf)
+        wall_time = time.perf_counter() - start
+    print(json.dumps({
+        'rows': 0 if df is None else len(df),
+        'wall_time': wall_time,
+        'peak_rss_mb': peak_rss_mb(),
+    }))
+    return 0 if df is not None else 1
+
+
+def command_extract(args):
+    """Measure peak memory of extraction on synthetic PDFs of increasing size
+    
+    With max_growth, fails when the peak grows by more than that many MB
+    per 100 pages between the smallest and largest PDF, which would mean
+    pages are being kept in memory again.
+    """
+    checker = InventoryChecker()
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for pages in args.pages:
+            pdf_path = os.path.join(workdir, f"synthetic_{pages}.pdf")
+            write_synthetic_pdf(pdf_path, checker, pages, args.lines_per_page, args.seed)
+            size_mb = os.path.getsize(pdf_path) / (1024 * 1024)
+            print(f"\n{pages} pages, {pages * args.lines_per_page} lines ({size_mb:.1f} MB)")
+
+            modes = (['before'] if args.compare_before else []) + ['normal']
+            for mode in modes:
+                # A fresh process per run, so the peak RSS belongs to that run only
+                command = [sys.executable, os.path.abspath(__file__), 'extract-once', pdf_path, '--mode', mode]
+                completed = subprocess.run(command, capture_output=True, text=True)
+                if completed.returncode != 0:
+                    print(f"  Extraction failed:\n{completed.stdout}{completed.stderr}")
+                    return 1
+                result = json.loads(completed.stdout.strip().splitlines()[-1])
+                result.update({'pages': pages, 'mode': mode})
+                results.append(result)
+                rss = f"{result['peak_rss_mb']:.0f} MB" if result['peak_rss_mb'] is not None else 'n/a'
+                print(f"  {mode:<11} {result['rows']} rows in {result['wall_time']:.1f}s, peak RSS {rss}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'runs': results}, f, indent=2)
+        print(f"\nResults saved to {args.output}")
+        
+    if args.max_growth is not None:
+        normal = sorted((result for result in results if result['mode'] == 'normal'), key=lambda result: result['pages'])
+        if len(normal) < 2 or normal[0]['peak_rss_mb'] is None:
+            print("\nCannot check memory growth: needs two PDF sizes and a readable peak RSS")
+            return 1
+        smallest, largest = normal[0], normal[-1]
+        growth = (largest['peak_rss_mb'] - smallest['peak_rss_mb']) / (largest['pages'] - smallest['pages']) * 100
+        print(f"\nPeak memory grows by {growth:.1f} MB per 100 pages (limit {args.max_growth:g} MB)")
+        if growth > args.max_growth:
+            print("FAIL: extraction memory is not bounded")
+            return 1
+        print("OK: extraction memory is bounded")
+    return 0
+
+
+def command_serve(args):
+    site = make_site(args)
+    base_url = site.start(args.port)
+    print(f"Stand-in site running at {base_url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        site.stop()
+        print(f"Served {site.stats.get('requests', 0)} requests")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the inventory checker against a local stand-in site')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    site_options = argparse.ArgumentParser(add_help=False)
+    site_options.add_argument('--latency', type=float, default=0.0, help='Seconds added to every response')
+    site_options.add_argument('--jitter', type=float, default=0.0, help='Random extra latency in seconds')
+    site_options.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with 503')
+    site_options.add_argument('--asset-coverage', type=float, default=0.8, help='Fraction of asset buttons present')
+    site_options.add_argument('--seed', type=int, default=0, help='Random seed for latency and errors')
+
+    run_parser = subparsers.add_parser('run', parents=[site_options], help='Run process_inventory end to end')
+    run_parser.add_argument('pdfs', nargs='*', help='Inventory PDFs (default: data/*.pdf)')
+    run_parser.add_argument('--runs', type=int, default=1, help='Runs per PDF')
+    run_parser.add_argument('--output', help='Save results as JSON (usable as a baseline)')
+    run_parser.add_argument('--baseline', help='Compare against a previous results file')
+    run_parser.add_argument('--tolerance', type=float, default=0.2, help='Allowed slowdown before a regression is reported')
+    run_parser.add_argument('--verbose', action='store_true', help='Show the checker log')
+    run_parser.set_defaults(func=command_run)
+
+    startup_parser = subparsers.add_parser('startup', help='Check GUI time-to-first-window against a budget')
+    startup_parser.add_argument('--runs', type=int, default=3, help='Number of launches (the median is used)')
+    startup_parser.add_argument('--budget', type=float, default=3.0, help='Maximum median seconds to the first window')
+    startup_parser.set_defaults(func=command_startup)
+
+    memory_parser = subparsers.add_parser('memory', help='Measure inventory memory on a synthetic inventory')
+    memory_parser.add_argument('--rows', type=int, default=50000, help='Number of synthetic inventory lines')
+    memory_parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic inventory')
+    memory_parser.add_argument('--output', help='Save results as JSON')
+    memory_parser.set_defaults(func=command_memory)
+
+    extract_parser = subparsers.add_parser('extract', help='Compare extraction memory on synthetic multi-page PDFs')
+    extract_parser.add_argument('--pages', type=int, nargs='+', default=[500, 2000], help='Page counts of the synthetic PDFs')
+    extract_parser.add_argument('--lines-per-page', type=int, default=70, help='Inventory lines on each page')
+    extract_parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic inventory')
+    extract_parser.add_argument('--compare-before', action='store_true',
+                                help='Also run extraction without releasing pages (needs several GB for large PDFs)')
+    extract_parser.add_argument('--output', help='Save results as JSON')
+    extract_parser.add_argument('--max-growth', type=float, metavar='MB',
+                                help='Fail if peak memory grows by more than MB per 100 pages')
+    extract_parser.set_defaults(func=command_extract)
+
+    extract_once_parser = subparsers.add_parser('extract-once', help='Extract one PDF and print its memory use (used by extract)')
+    extract_once_parser.add_argument('pdf', help='Inventory PDF')
+    extract_once_parser.add_argument('--mode', choices=['before', 'normal'], default='normal', help='Extraction mode')
+    extract_once_parser.set_defaults(func=command_extract_once)
+
+    serve_parser = subparsers.add_parser('serve', parents=[site_options], help='Only run the stand-in site')
+    serve_parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    serve_parser.set_defaults(func=command_serve)
+
+    args = parser.parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
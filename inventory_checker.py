@@ -1,21 +1,611 @@
 import os
-import pandas as pd
-import pdfplumber
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+import sys
 import time
 import re
 import argparse
-from datetime import datetime
-from openpyxl import load_workbook
-from openpyxl.styles import PatternFill
+from datetime import datetime, timedelta
 from difflib import get_close_matches
-import requests
+import gzip
+import json
+import threading
+import contextlib
+import shutil
+from collections import Counter
+from urllib.parse import urlsplit, urlunsplit
+
+# Heavy dependencies (pandas, pdfplumber, selenium, webdriver_manager,
+# openpyxl, requests) are imported inside the methods that use them, so
+# importing this module - and starting the GUI - stays fast.
+
+# Inventory columns filled in by the website checks (journaled for --resume)
+RESULT_COLUMNS = [
+    'On Website',
+    'Has Spec Sheet',
+    'Has Shelf-Talker',
+    'Has Hi-Res Label',
+    'Has Bottle Shot',
+    'Product URL',
+    'Varietal Mismatch'
+]
+
+# Stock columns read from the PDF, stored as integers
+STOCK_COLUMNS = ['On Hand', 'On Order', 'Available']
+
+# Inventory columns in report order
+INVENTORY_COLUMNS = ['SKU', 'Vintage', 'Producer', 'Product', 'Full Description'] + STOCK_COLUMNS + ['Stock Issue'] + RESULT_COLUMNS + ['Check Status']
+
+# Website flags that count as missing marketing assets
+ASSET_COLUMNS = ['Has Spec Sheet', 'Has Shelf-Talker', 'Has Hi-Res Label', 'Has Bottle Shot']
+
+# Weights of the parts of a producer's check priority (see schedule_producers)
+PRIORITY_WEIGHTS = {
+    'available': 0.5,      # share of all available stock
+    'never_checked': 0.3,  # share of its SKUs without a known URL
+    'stale': 0.2           # product listing not loaded yet in this session
+}
+
+# Fuzzy matching of unmapped SKUs to website products (see match_website_products)
+MATCH_THRESHOLD = 0.3  # Lowest score accepted as a match (exclusive)
+VINTAGE_BONUS = 0.3  # Added when the website name contains the SKU's vintage
+
+def parse_deadline(text):
+    """Turn 'HH:MM' (the next time it comes round) or '+MINUTES' into a timestamp"""
+    now = datetime.now()
+    if text.startswith('+'):
+        return now.timestamp() + float(text[1:]) * 60
+    hour, minute = (int(part) for part in text.split(':'))
+    deadline = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if deadline <= now:
+        deadline += timedelta(days=1)
+    return deadline.timestamp()
+
+def solve_assignment(cost):
+    """Minimum-cost one-to-one assignment for a square cost matrix (Hungarian method)
+    
+    Returns an array with the column assigned to each row. Runs in
+    O(n^3) with the inner scans done by NumPy, which is plenty for the
+    few dozen wines of one producer.
+    """
+    import numpy as np
+    size = cost.shape[0]
+    row_potential = np.zeros(size + 1)
+    column_potential = np.zeros(size + 1)
+    owner = np.zeros(size + 1, dtype=int)  # Row (1-based) assigned to each column, 0 if none
+    previous = np.zeros(size + 1, dtype=int)
+    for row in range(1, size + 1):
+        owner[0] = row
+        column = 0
+        slack = np.full(size + 1, np.inf)
+        visited = np.zeros(size + 1, dtype=bool)
+        while True:
+            visited[column] = True
+            current = owner[column]
+            reduced = cost[current - 1] - row_potential[current] - column_potential[1:]
+            better = ~visited[1:] & (reduced < slack[1:])
+            slack[1:][better] = reduced[better]
+            previous[1:][better] = column
+            candidates = np.where(visited[1:], np.inf, slack[1:])
+            next_column = int(np.argmin(candidates)) + 1
+            delta = candidates[next_column - 1]
+            row_potential[owner[visited]] += delta
+            column_potential[visited] -= delta
+            slack[1:][~visited[1:]] -= delta
+            column = next_column
+            if owner[column] == 0:
+                break
+        while column:
+            owner[column] = owner[previous[column]]
+            column = previous[column]
+    assignment = np.zeros(size, dtype=int)
+    assignment[owner[1:] - 1] = np.arange(size)
+    return assignment
+
+def slug_tokens(text):
+    """Lowercase words of a name as they appear in a URL slug ("Alice's" -> 'alices')"""
+    return re.sub(r'[^a-z0-9]+', ' ', text.lower().replace("'", '')).split()
+
+def description_year(description):
+    """The 4-digit vintage year written in an inventory description, or None"""
+    match = re.search(r'\b(19|20)\d\d\b', description)
+    return match.group(0) if match else None
+
+def canonical_url(url, base_url=None):
+    """Normalize a page URL so the same page always has the same key
+    
+    Lowercases the scheme, host and path, drops the query and fragment and
+    makes sure the path ends with a slash, as WordPress pages do. URLs on
+    the base_url host (with or without www.) take its scheme and host, so
+    http and https links to the site compare equal.
+    """
+    parts = urlsplit(url.strip())
+    scheme, host = parts.scheme.lower(), parts.netloc.lower()
+    if base_url:
+        base = urlsplit(base_url)
+        if re.sub(r'^www\.', '', host) == re.sub(r'^www\.', '', base.netloc.lower()):
+            scheme, host = base.scheme, base.netloc
+    path = parts.path.lower() or '/'
+    if not path.endswith('/'):
+        path += '/'
+    return urlunsplit((scheme, host, path, '', ''))
+
+def load_json_file(path, description):
+    """Read a small JSON state file, returning None if it is missing or unreadable"""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Could not read {description} from {path}: {e}")
+        return None
+
+def save_json_file(path, data, description):
+    """Replace a small JSON state file without leaving it half written"""
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+        return True
+    except OSError as e:
+        print(f"Could not save {description} to {path}: {e}")
+        return False
+
+def parse_quantity(text):
+    """Parse a stock quantity such as '1,234', '-5', '5-', '(5)' or '95/00'
+    
+    The warehouse report gives stock as cases/bottles; the case count is
+    returned and loose bottles are left out. Returns None if the text is
+    not a whole number.
+    """
+    value = text.strip().replace(',', '')
+    negative = False
+    if value.startswith('(') and value.endswith(')'):
+        value, negative = value[1:-1], True
+    elif value.endswith('-'):
+        value, negative = value[:-1], True
+    elif value.startswith('-'):
+        value, negative = value[1:], True
+    match = re.fullmatch(r'(\d+)(?:\.0*|/\d+)?', value)
+    if not match:
+        return None
+    quantity = int(match.group(1))
+    return -quantity if negative else quantity
+
+def find_table_header(words):
+    """The words of the ON HAND / ON ORDER / AVAILABLE header line, or None"""
+    for available in words:
+        if available['text'] != 'AVAILABLE':
+            continue
+        header = [word for word in words if abs(word['top'] - available['top']) < 3]
+        texts = {word['text'] for word in header}
+        if 'HAND' in texts and 'ORDER' in texts:
+            return header
+    return None
+
+
+class InventoryColumns:
+    """Column-oriented buffer for parsed inventory lines
+    
+    Each field goes into its own list instead of building one dict per
+    line, and to_dataframe() turns the lists into compact typed columns:
+    categories for the few distinct producers and vintages, integers for
+    stock and booleans for the website flags.
+    """
+    __slots__ = ('sku', 'vintage', 'producer', 'product', 'description', 'on_hand', 'on_order', 'available', 'stock_issue')
+    
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, [])
+            
+    def __len__(self):
+        return len(self.sku)
+        
+    def append(self, sku, vintage, producer, product, description, on_hand, on_order, available):
+        """Add one line; stock values are parsed here and unreadable ones flagged"""
+        quantities = []
+        issues = []
+        for column, text in zip(STOCK_COLUMNS, (on_hand, on_order, available)):
+            quantity = parse_quantity(text)
+            if quantity is None:
+                issues.append(f"{column}: '{text}'")
+            quantities.append(quantity)
+            
+        self.sku.append(sku)
+        self.vintage.append(vintage)
+        self.producer.append(producer)
+        self.product.append(product)
+        self.description.append(description)
+        self.on_hand.append(quantities[0])
+        self.on_order.append(quantities[1])
+        self.available.append(quantities[2])
+        self.stock_issue.append(', '.join(issues))
+        
+    def issue_count(self):
+        return sum(1 for issue in self.stock_issue if issue)
+        
+    def to_dataframe(self):
+        """Build the inventory DataFrame with the website result columns unset"""
+        import pandas as pd
+        df = pd.DataFrame({
+            'SKU': self.sku,
+            'Vintage': pd.Categorical(self.vintage),
+            'Producer': pd.Categorical(self.producer),
+            'Product': self.product,
+            'Full Description': self.description,
+            'Stock Issue': self.stock_issue,
+        })
+        for column, values in zip(STOCK_COLUMNS, (self.on_hand, self.on_order, self.available)):
+            df[column] = pd.array(values, dtype='Int64')
+        for column in RESULT_COLUMNS:
+            df[column] = '' if column == 'Product URL' else False
+        df['Check Status'] = 'Not checked'
+        return df[INVENTORY_COLUMNS]
+
+def build_stock_summary(inventory_df):
+    """Stock per producer, with the available units that need website fixes
+    
+    Negative available stock (oversold lines) counts as zero towards the
+    units not on the website or missing assets, and SKUs that were not
+    checked are not counted as missing from the website.
+    """
+    available = inventory_df['Available'].fillna(0).clip(lower=0)
+    missing_assets = ~inventory_df[ASSET_COLUMNS].all(axis=1)
+    on_website = inventory_df['On Website'].astype(bool)
+    checked = inventory_df['Check Status'] == 'Checked'
+    df = inventory_df.assign(**{
+        'Not On Website': checked & ~on_website,
+        'Missing Assets': on_website & missing_assets,
+        'Available Not On Website': available.where(checked & ~on_website, 0),
+        'Available Missing Assets': available.where(on_website & missing_assets, 0),
+        'Stock Issues': inventory_df['Stock Issue'] != '',
+        'Not Checked': inventory_df['Check Status'] == 'Not checked',
+    })
+    summary = df.groupby('Producer', observed=True).agg(**{
+        'SKUs': ('SKU', 'count'),
+        'On Hand': ('On Hand', 'sum'),
+        'On Order': ('On Order', 'sum'),
+        'Available': ('Available', 'sum'),
+        'SKUs Not On Website': ('Not On Website', 'sum'),
+        'Available Not On Website': ('Available Not On Website', 'sum'),
+        'SKUs Missing Assets': ('Missing Assets', 'sum'),
+        'Available Missing Assets': ('Available Missing Assets', 'sum'),
+        'Stock Issues': ('Stock Issues', 'sum'),
+        'SKUs Not Checked': ('Not Checked', 'sum'),
+    })
+    
+    # Producers with the most unlisted or incomplete stock first
+    summary = summary.sort_values(['Available Not On Website', 'Available Missing Assets'], ascending=False)
+    return summary.reset_index()
+
+class Tracer:
+    """Records timed spans and writes them in Chrome trace-event format
+    
+    The resulting file can be opened in Perfetto or chrome://tracing.
+    """
+    def __init__(self):
+        self.events = []
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        
+    def begin(self, name, category='stage', **args):
+        """Start a span and return a token for end()"""
+        return (name, category, args, time.perf_counter())
+        
+    def end(self, token):
+        """Finish a span started with begin()"""
+        name, category, args, start = token
+        end = time.perf_counter()
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (start - self.origin) * 1e6,
+            'dur': (end - start) * 1e6,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': args
+        }
+        with self.lock:
+            self.events.append(event)
+            
+    @contextlib.contextmanager
+    def span(self, name, category='stage', **args):
+        """Time the enclosed block as one span"""
+        token = self.begin(name, category, **args)
+        try:
+            yield
+        finally:
+            self.end(token)
+            
+    def save(self, path):
+        """Write all spans as a trace.json file"""
+        with self.lock:
+            events = list(self.events)
+        metadata = {
+            'name': 'process_name',
+            'ph': 'M',
+            'pid': os.getpid(),
+            'args': {'name': 'InventoryChecker'}
+        }
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': [metadata] + events, 'displayTimeUnit': 'ms'}, f)
+            
+    def print_summary(self, top=10):
+        """Print the stages with the most total time and the slowest URLs"""
+        with self.lock:
+            events = list(self.events)
+        if not events:
+            return
+            
+        totals = {}
+        for event in events:
+            total, calls = totals.get(event['name'], (0.0, 0))
+            totals[event['name']] = (total + event['dur'], calls + 1)
+            
+        print("\nTiming summary:")
+        print(f"  {'Stage':<32} {'Total':>10} {'Calls':>7} {'Average':>10}")
+        for name, (total, calls) in sorted(totals.items(), key=lambda item: -item[1][0])[:top]:
+            print(f"  {name:<32} {total / 1e6:>9.2f}s {calls:>7} {total / calls / 1e6:>9.2f}s")
+            
+        fetches = sorted((event for event in events if 'url' in event['args']), key=lambda event: -event['dur'])
+        if fetches:
+            print("\nSlowest URLs:")
+            for event in fetches[:top]:
+                print(f"  {event['dur'] / 1e6:>7.2f}s  {event['name']:<14} {event['args']['url']}")
+
+
+class StageProfiler:
+    """Profiles pipeline stages with cProfile and a stack sampler
+    
+    Each stage is saved as a .pstats file (exact call counts and times, for
+    pstats or snakeviz) and a .collapsed file of sampled stacks, one
+    "frame;frame;frame count" line per stack, for flamegraph.pl or
+    speedscope. Sampling also catches time spent waiting on the browser.
+    """
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.stages = []  # (name, cProfile.Profile, Counter of stacks)
+        
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Profile the enclosed block (stages must not be nested)"""
+        import cProfile
+        profile = cProfile.Profile()
+        samples = Counter()
+        stop = threading.Event()
+        sampler = threading.Thread(
+            target=self.sample, args=(threading.get_ident(), samples, stop), daemon=True
+        )
+        sampler.start()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            stop.set()
+            sampler.join()
+            self.stages.append((name, profile, samples))
+            
+    def sample(self, thread_id, samples, stop):
+        while not stop.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                samples[';'.join(reversed(stack))] += 1
+                
+    def save(self, directory):
+        """Write every stage's profiles into directory and return the file paths"""
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for position, (name, profile, samples) in enumerate(self.stages, 1):
+            base = os.path.join(directory, f"{position:02d}_{name}")
+            profile.dump_stats(base + '.pstats')
+            with open(base + '.collapsed', 'w') as f:
+                for stack, count in samples.most_common():
+                    f.write(f"{stack} {count}\n")
+            paths.extend([base + '.pstats', base + '.collapsed'])
+        return paths
+
+class ProgressTracker:
+    """Thread-safe progress state shared between the checker and its callers
+    
+    The checker updates it as work completes; readers such as the GUI call
+    snapshot() at their own pace, so their cost does not depend on how fast
+    checks finish.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+        
+    def reset(self):
+        with self.lock:
+            self.stage = 'Idle'
+            self.done = 0
+            self.total = 0
+            self.producer = None
+            self.fetches = 0
+            self.started = time.perf_counter()
+            self.stage_started = self.started
+            
+    def set_stage(self, stage, total=0):
+        """Start a new stage with its own done/total counters"""
+        with self.lock:
+            self.stage = stage
+            self.done = 0
+            self.total = total
+            self.stage_started = time.perf_counter()
+            
+    def update(self, done, total=None, producer=None):
+        with self.lock:
+            self.done = done
+            if total is not None:
+                self.total = total
+            if producer is not None:
+                self.producer = producer
+                
+    def add_fetch(self, count=1):
+        """Count a completed page load or HEAD request"""
+        with self.lock:
+            self.fetches += count
+            
+    def snapshot(self):
+        """Return the current progress as a dict"""
+        with self.lock:
+            now = time.perf_counter()
+            elapsed = now - self.started
+            stage_elapsed = now - self.stage_started
+            rate = self.done / stage_elapsed if self.done and stage_elapsed > 0 else 0
+            if self.total and self.done >= self.total:
+                eta = 0
+            elif rate:
+                eta = (self.total - self.done) / rate
+            else:
+                eta = None
+            return {
+                'stage': self.stage,
+                'done': self.done,
+                'total': self.total,
+                'producer': self.producer,
+                'urls_per_sec': self.fetches / elapsed if elapsed > 0 else 0,
+                'eta': eta,
+                'elapsed': elapsed
+            }
+
+
+# Metrics kept by InventoryChecker: name -> (type, help)
+METRICS = {
+    'inventory_pages_fetched_total': ('counter', 'Pages loaded from the website, by kind'),
+    'inventory_page_bytes_total': ('counter', 'Bytes transferred for loaded pages, by kind'),
+    'inventory_fetch_seconds': ('histogram', 'Time to load a page or answer a HEAD request, by kind'),
+    'inventory_fetch_retries_total': ('counter', 'Failed page loads that were retried'),
+    'inventory_fetch_errors_total': ('counter', 'Page loads that failed after every retry'),
+    'inventory_driver_starts_total': ('counter', 'Browser sessions started'),
+    'inventory_driver_restarts_total': ('counter', 'Browser sessions replaced after a failure'),
+    'inventory_cache_lookups_total': ('counter', 'Cache lookups by cache and result (hit or miss)'),
+    'inventory_matches_total': ('counter', 'Inventory SKUs by how their website page was found'),
+    'inventory_extracted_rows_total': ('counter', 'Inventory rows read from PDFs'),
+    'inventory_extraction_rows_per_second': ('gauge', 'Rows per second of the last PDF extraction'),
+    'inventory_runs_total': ('counter', 'Inventory runs by result'),
+    'inventory_last_run_duration_seconds': ('gauge', 'Wall time of the last inventory run'),
+    'inventory_last_run_timestamp_seconds': ('gauge', 'Unix time the last inventory run finished'),
+}
+
+# Upper bounds of the fetch latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+class Metrics:
+    """Counters, gauges and histograms written in the Prometheus text format
+    
+    Values accumulate for the life of the object, so the watch folder and
+    the job service can be scraped for trends across runs.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}      # (name, labels) -> value, for counters and gauges
+        self.histograms = {}  # (name, labels) -> [count per bucket..., sum, count]
+        
+    @staticmethod
+    def key(name, labels):
+        return name, tuple(sorted(labels.items()))
+        
+    def inc(self, name, amount=1, **labels):
+        key = self.key(name, labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+            
+    def set(self, name, value, **labels):
+        with self.lock:
+            self.values[self.key(name, labels)] = value
+            
+    def observe(self, name, value, **labels):
+        key = self.key(name, labels)
+        with self.lock:
+            histogram = self.histograms.setdefault(key, [0] * (len(LATENCY_BUCKETS) + 2))
+            for position, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    histogram[position] += 1
+            histogram[-2] += value
+            histogram[-1] += 1
+            
+    def snapshot(self):
+        """Plain copy of all values (picklable, see merge())"""
+        with self.lock:
+            return {'values': dict(self.values), 'histograms': {key: list(h) for key, h in self.histograms.items()}}
+            
+    def merge(self, snapshot):
+        """Add the counters and histograms of another Metrics snapshot; gauges are replaced"""
+        with self.lock:
+            for key, value in snapshot['values'].items():
+                if METRICS[key[0]][0] == 'counter':
+                    self.values[key] = self.values.get(key, 0) + value
+                else:
+                    self.values[key] = value
+            for key, other in snapshot['histograms'].items():
+                histogram = self.histograms.setdefault(key, [0] * len(other))
+                for position, value in enumerate(other):
+                    histogram[position] += value
+                    
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        def label_text(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+            
+        state = self.snapshot()
+        lines = []
+        for name, (kind, help_text) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == 'histogram':
+                for (metric, labels), histogram in sorted(state['histograms'].items()):
+                    if metric != name:
+                        continue
+                    for bound, count in zip(LATENCY_BUCKETS, histogram):
+                        lines.append(f"{name}_bucket{label_text(labels, [('le', bound)])} {count}")
+                    lines.append(f"{name}_bucket{label_text(labels, [('le', '+Inf')])} {histogram[-1]}")
+                    lines.append(f"{name}_sum{label_text(labels)} {histogram[-2]:.6f}")
+                    lines.append(f"{name}_count{label_text(labels)} {histogram[-1]}")
+            else:
+                for (metric, labels), value in sorted(state['values'].items()):
+                    if metric == name:
+                        lines.append(f"{name}{label_text(labels)} {value!r}")
+        return '\n'.join(lines) + '\n'
+        
+    def save(self, path):
+        with open(path, 'w') as f:
+            f.write(self.render())
+
+def serve_metrics(metrics, port, host='127.0.0.1'):
+    """Serve metrics at http://host:port/metrics from a background thread"""
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            payload = metrics.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            
+        def log_message(self, format, *args):
+            pass
+            
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    print(f"Metrics available at http://{host}:{server.server_port}/metrics")
+    return server
 
 class InventoryChecker:
     def __init__(self):
@@ -25,6 +615,30 @@ class InventoryChecker:
         self.page_load_timeout = 30
         self.wait = None
         self.progress_callback = None  # Callback for progress updates
+        self.progress = ProgressTracker()  # Progress state for polling callers
+        self.output_file = None  # Path of the last generated report
+        
+        # Cooperative cancellation, checked between fetches (see cancel())
+        self.cancel_event = threading.Event()
+        
+        # Append-only checkpoint of completed SKUs; resume picks up from it
+        self.resume = False
+        self.checkpoint_dir = ''  # Directory for checkpoint files (default: current directory)
+        self.checkpoint_path = None
+        self.checkpoint_file = None
+        self.resumed_rows = {}
+        self.resumed_producers = {}
+        self.resumed_url_results = {}
+        self.resumed_methods = {}
+        self.journal_buffer = None  # Collects entries instead in worker processes
+        
+        # Per-SKU results of every run are added to this database (None turns it off)
+        self.history_path = 'inventory_history.sqlite'
+        self.match_methods = {}  # SKU -> how its URL was found in this run
+        self.fetch_times = {}  # Product URL -> seconds its page took to load in this run
+        
+        # Worker processes used to check producers (see check_producers_in_processes)
+        self.processes = 1
         
         # Define SKUs that are allowed to share URLs (intentionally)
         self.allowed_duplicate_skus = {
@@ -275,6 +889,68 @@ class InventoryChecker:
         # Dictionary to store learned URL patterns
         self.url_patterns = {}
         self.learned_urls = {}
+        self.slug_vocabulary = {'prefixes': {}, 'expansions': {}, 'dropped': []}
+        self.unverified_skus = set()  # SKUs whose candidate URLs all failed in this run
+        self.max_url_probes = 3  # HEAD requests per SKU when candidates are not in a listing
+        
+        # Pages already checked by this checker, shared by every PDF it processes
+        self.producer_products_cache = {}
+        self.product_details_cache = {}
+        
+        # Product page results of the current run by canonical URL, and
+        # fetches in flight (shared between service workers) so the same
+        # page is never loaded twice at once
+        self.url_memo = {}
+        self.inflight = {}
+        self.inflight_lock = threading.Lock()
+        self.fetch_stats = Counter()
+        
+        # Fast mode only crawls producers that have SKUs without a known URL;
+        # the others use listings saved by earlier runs for the Website Only
+        # sheet until they are listing_refresh seconds old
+        self.fast_mode = False
+        self.listing_refresh = 24 * 3600
+        self.listings_path = 'producer_listings.json'
+        self.saved_listings = None  # producer -> {'fetched': time, 'products': [...]}, loaded on first use
+        self.listings_changed = False
+        
+        # Redirects observed while loading pages (canonical URL -> canonical
+        # target), kept between runs so each page is fetched under one URL
+        self.redirects_path = 'url_redirects.json'
+        self.redirects = None  # Loaded on first use
+        self.redirects_changed = False
+        
+        # Canonical product URLs seen in listings, used to spot WordPress
+        # "-2" copies of a predicted URL
+        self.known_urls = set()
+        
+        # Keep the browser open after a report (set while processing a batch)
+        self.keep_driver_open = False
+        
+        # Time (time.time()) by which the report must be written, and the
+        # seconds kept in reserve for writing it
+        self.deadline = None
+        self.deadline_reserve = 60
+        
+        # Set once URL patterns are learned and mappings pass the duplicate check
+        self.mappings_checked = False
+        self.cache_started = time.time()
+        
+        # Offline site snapshot (see create_snapshot / load_snapshot)
+        self.snapshot = None
+        
+        # Timing spans for each stage and fetch; saved to trace_path if set
+        self.tracer = Tracer()
+        self.trace_path = None
+        
+        # Counters and histograms for Prometheus; written to metrics_path
+        # after every run if set
+        self.metrics = Metrics()
+        self.metrics_path = None
+        
+        # Profile each stage of a run and save the profiles next to the report
+        self.profile = False
+        self.profiler = None
         
     def find_producer_in_text(self, text):
         """Find the producer in the text using our known list"""
@@ -318,105 +994,242 @@ class InventoryChecker:
         
     def extract_pdf_data(self, pdf_path):
         """Extract data from PDF using direct text extraction"""
+        import pdfplumber
         print(f"\nExtracting data from {pdf_path}...")
-        data = []
+        rows = InventoryColumns()
+        started = time.perf_counter()
         
         try:
             with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    text = page.extract_text()
-                    lines = text.split('\n')
-                    
-                    for line in lines:
-                        # Skip header lines and empty lines
-                        if not line.strip() or 'DESCRIPTION' in line or 'PAGE' in line or 'RUN' in line:
-                            continue
+                layout = None
+                for number, page in enumerate(pdf.pages):
+                    if number == 0:
+                        words = page.extract_words()
+                        header = find_table_header(words)
+                        layout = self.learn_table_layout(header) if header else None
+                        if layout is None:
+                            print("Column header not found, reading the pages as plain text")
+                    elif layout is not None:
+                        # Only the table region, starting at the header line, is analyzed
+                        top = min(layout['top'], page.height)
+                        words = page.crop((0, top, page.width, page.height)).extract_words()
+                        header = find_table_header(words)
+                        if header is None:
+                            # The header sits higher than on the first page (or is
+                            # missing), so read the whole page rather than cut off rows
+                            print(f"Column header not found below {top:.0f}pt on page {number + 1}, reading the whole page")
+                            words = page.extract_words()
+                            header = find_table_header(words)
+                        else:
+                            shift = min(word['top'] for word in header) - layout['top'] - 1
+                            if shift > 3:
+                                print(f"Column header on page {number + 1} is {shift:.0f}pt lower than on the first page")
                             
-                        # Each line should start with an 'S' followed by alphanumeric characters
-                        if line[0] == 'S':
-                            try:
-                                # Split by spaces, but keep the description together
-                                parts = line.split()
-                                if len(parts) >= 4:  # Make sure we have at least SKU, description, and some numbers
-                                    sku = parts[0]
-                                    
-                                    # The last three numbers are on_hand, on_order, available
-                                    available = parts[-1]
-                                    on_order = parts[-2]
-                                    on_hand = parts[-3]
-                                    
-                                    # Everything in between is the description
-                                    description = ' '.join(parts[1:-3])
-                                    
-                                    # Parse the description into components
-                                    vintage, producer, product = self.parse_description(description)
-                                    
-                                    data.append({
-                                        'SKU': sku,
-                                        'Vintage': vintage,
-                                        'Producer': producer,
-                                        'Product': product,
-                                        'Full Description': description,
-                                        'On Hand': on_hand,
-                                        'On Order': on_order,
-                                        'Available': available,
-                                        'On Website': False,
-                                        'Has Spec Sheet': False,
-                                        'Has Shelf-Talker': False,
-                                        'Has Hi-Res Label': False,
-                                        'Has Bottle Shot': False,
-                                        'Product URL': '',
-                                        'Varietal Mismatch': False
-                                    })
-                            except Exception as e:
-                                print(f"Skipping line due to error: {str(e)}")
-                                continue
+                    if layout is not None:
+                        if header:
+                            bottom = max(word['bottom'] for word in header)
+                            words = [word for word in words if word['top'] >= bottom]
+                        self.parse_inventory_words(words, layout, rows)
+                        # Only keep the columns if the first page's quantities actually line up under them
+                        if number == 0 and (not len(rows) or rows.issue_count() * 2 > len(rows)):
+                            print("Quantities are not aligned under the column header, reading the pages as plain text")
+                            layout = None
+                            rows = InventoryColumns()
+                    if layout is None:
+                        text = page.extract_text() or ''
+                        self.parse_inventory_lines(text.split('\n'), rows)
+                    
+                    # Drop the page's parsed layout objects, which pdfplumber
+                    # would otherwise keep until the document is closed
+                    release = getattr(page, 'close', None) or getattr(page, 'flush_cache', None)
+                    if release:
+                        release()
                                 
         except Exception as e:
             print(f"Error extracting PDF data: {str(e)}")
             return None
             
-        if not data:
+        if not len(rows):
             print("\nNo data was extracted from the PDF!")
             return None
             
-        print(f"\nExtraction complete. Found {len(data)} products.")
-        return pd.DataFrame(data)
+        elapsed = time.perf_counter() - started
+        self.metrics.inc('inventory_extracted_rows_total', len(rows))
+        if elapsed > 0:
+            self.metrics.set('inventory_extraction_rows_per_second', len(rows) / elapsed)
+        print(f"\nExtraction complete. Found {len(rows)} products.")
+        if rows.issue_count():
+            print(f"Warning: {rows.issue_count()} lines have stock values that are not numbers (see the Stock Issue column)")
+        return rows.to_dataframe()
+
+    def learn_table_layout(self, header):
+        """Learn the table's column boundaries from the ON HAND / ON ORDER / AVAILABLE header line"""
+        hand = next(word for word in header if word['text'] == 'HAND')
+        order = next(word for word in header if word['text'] == 'ORDER')
+        available = next(word for word in header if word['text'] == 'AVAILABLE')
+        first = min((word for word in header if word['text'] == 'ON'), key=lambda word: word['x0'], default=hand)
+        # Quantities are right-aligned under their headings, so a word belongs
+        # to the column whose heading its right edge is closest to
+        return {
+            'top': max(min(word['top'] for word in header) - 1, 0),  # Crop above the header so its glyphs stay whole
+            'description_end': first['x0'],
+            'on_hand_end': (hand['x1'] + order['x1']) / 2,
+            'on_order_end': (order['x1'] + available['x1']) / 2,
+        }
+
+    def parse_inventory_words(self, words, layout, rows):
+        """Parse the words of one page's table region and append them to rows"""
+        lines = []
+        for word in sorted(words, key=lambda word: (word['top'], word['x0'])):
+            if lines and word['top'] - lines[-1][0]['top'] < 3:
+                lines[-1].append(word)
+            else:
+                lines.append([word])
+                
+        for line in lines:
+            line.sort(key=lambda word: word['x0'])
+            sku = line[0]['text']
+            # Each line should start with an 'S' followed by alphanumeric characters
+            if sku[0] != 'S' or line[0]['x1'] > layout['description_end']:
+                continue
+            try:
+                fields = {'description': [], 'on_hand': [], 'on_order': [], 'available': []}
+                for word in line[1:]:
+                    if word['x1'] <= layout['description_end']:
+                        fields['description'].append(word['text'])
+                    elif word['x1'] <= layout['on_hand_end']:
+                        fields['on_hand'].append(word['text'])
+                    elif word['x1'] <= layout['on_order_end']:
+                        fields['on_order'].append(word['text'])
+                    else:
+                        fields['available'].append(word['text'])
+                # Lines without any quantity are wrapped text, not inventory lines
+                if not (fields['on_hand'] or fields['on_order'] or fields['available']):
+                    continue
+                    
+                description = ' '.join(fields['description'])
+                vintage, producer, product = self.parse_description(description)
+                rows.append(
+                    sku, vintage, producer, product, description,
+                    ' '.join(fields['on_hand']), ' '.join(fields['on_order']), ' '.join(fields['available'])
+                )
+            except Exception as e:
+                print(f"Skipping line due to error: {str(e)}")
+                continue
+
+    def parse_inventory_lines(self, lines, rows):
+        """Parse inventory lines of one page and append them to rows"""
+        for line in lines:
+            # Skip header lines and empty lines
+            if not line.strip() or 'DESCRIPTION' in line or 'PAGE' in line or 'RUN' in line:
+                continue
+                
+            # Each line should start with an 'S' followed by alphanumeric characters
+            if line[0] == 'S':
+                try:
+                    # Split by spaces, but keep the description together
+                    parts = line.split()
+                    if len(parts) >= 4:  # Make sure we have at least SKU, description, and some numbers
+                        sku = parts[0]
+                        
+                        # The last three numbers are on_hand, on_order, available
+                        available = parts[-1]
+                        on_order = parts[-2]
+                        on_hand = parts[-3]
+                        
+                        # Everything in between is the description
+                        description = ' '.join(parts[1:-3])
+                        
+                        # Parse the description into components
+                        vintage, producer, product = self.parse_description(description)
+                        
+                        rows.append(sku, vintage, producer, product, description, on_hand, on_order, available)
+                except Exception as e:
+                    print(f"Skipping line due to error: {str(e)}")
+                    continue
 
     def setup_selenium(self):
         """Initialize Selenium WebDriver with retry logic"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from selenium.webdriver.support.ui import WebDriverWait
+        from webdriver_manager.chrome import ChromeDriverManager
         print("\nSetting up web browser...")
-        for attempt in range(self.max_retries):
-            try:
-                if self.driver is not None:
-                    try:
-                        self.driver.quit()
-                    except:
-                        pass
-                options = webdriver.ChromeOptions()
-                options.add_argument('--headless')
-                options.add_argument('--disable-gpu')
-                options.add_argument('--no-sandbox')
-                options.add_argument('--disable-dev-shm-usage')
-                options.add_argument('--window-size=1920,1080')
-                # Performance optimizations
-                options.add_argument('--disable-extensions')
-                options.add_argument('--disable-images')
-                options.add_argument('--disable-javascript')
-                options.add_argument('--blink-settings=imagesEnabled=false')
-                options.page_load_strategy = 'eager'
-                service = Service(ChromeDriverManager().install())
-                self.driver = webdriver.Chrome(service=service, options=options)
-                self.driver.set_page_load_timeout(self.page_load_timeout)
-                self.wait = WebDriverWait(self.driver, 10)
-                return True
-            except Exception as e:
-                print(f"Attempt {attempt + 1} failed: {str(e)}")
-                time.sleep(2)
-        return False
+        if self.driver is not None:
+            self.metrics.inc('inventory_driver_restarts_total')
+        with self.tracer.span('setup_selenium'):
+            for attempt in range(self.max_retries):
+                try:
+                    if self.driver is not None:
+                        try:
+                            self.driver.quit()
+                        except:
+                            pass
+                    options = webdriver.ChromeOptions()
+                    options.add_argument('--headless')
+                    options.add_argument('--disable-gpu')
+                    options.add_argument('--no-sandbox')
+                    options.add_argument('--disable-dev-shm-usage')
+                    options.add_argument('--window-size=1920,1080')
+                    # Performance optimizations
+                    options.add_argument('--disable-extensions')
+                    options.add_argument('--disable-images')
+                    options.add_argument('--disable-javascript')
+                    options.add_argument('--blink-settings=imagesEnabled=false')
+                    options.page_load_strategy = 'eager'
+                    service = Service(ChromeDriverManager().install())
+                    self.driver = webdriver.Chrome(service=service, options=options)
+                    self.driver.set_page_load_timeout(self.page_load_timeout)
+                    self.wait = WebDriverWait(self.driver, 10)
+                    self.metrics.inc('inventory_driver_starts_total')
+                    return True
+                except Exception as e:
+                    print(f"Attempt {attempt + 1} failed: {str(e)}")
+                    time.sleep(2)
+            return False
 
-    def safe_get_url(self, url, max_retries=None):
+    def resolve_url(self, url):
+        """Canonical form of a page URL, following redirects seen before"""
+        if self.redirects is None:
+            self.redirects = load_json_file(self.redirects_path, 'redirect map') or {}
+        url = canonical_url(url, self.base_url)
+        for _ in range(5):  # Guard against redirect loops
+            if url not in self.redirects:
+                break
+            url = self.redirects[url]
+        return url
+        
+    def record_redirect(self, source, target):
+        """Remember that source ended up at target (ignoring redirects off the product pages)"""
+        source = self.resolve_url(source)
+        target = canonical_url(target, self.base_url)
+        if source == target or urlsplit(target).path == '/':
+            return
+        if urlsplit(target).netloc != urlsplit(source).netloc:
+            return
+        print(f"Redirect: {source} -> {target}")
+        self.redirects[source] = target
+        self.redirects_changed = True
+        
+    def save_redirects(self):
+        if self.redirects_changed and save_json_file(self.redirects_path, self.redirects, 'redirect map'):
+            self.redirects_changed = False
+            
+    def suffixed_variant(self, url):
+        """A known WordPress duplicate-slug copy ('-2', '-3', ...) of a canonical URL"""
+        known = self.known_urls
+        if self.snapshot is not None:
+            known = known | self.snapshot['products'].keys()
+        for number in range(2, 10):
+            variant = f"{url[:-1]}-{number}/"
+            if variant in known:
+                return variant
+        return None
+
+    def safe_get_url(self, url, max_retries=None, kind='page'):
         """Safely navigate to a URL with retry logic"""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
         if max_retries is None:
             max_retries = self.max_retries
             
@@ -426,10 +1239,18 @@ class InventoryChecker:
                     if not self.setup_selenium():
                         return False
                 print(f"\nLoading {url}...")
+                started = time.perf_counter()
                 self.driver.get(url)
                 self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+                self.metrics.observe('inventory_fetch_seconds', time.perf_counter() - started, kind=kind)
+                self.metrics.inc('inventory_pages_fetched_total', kind=kind)
+                self.metrics.inc('inventory_page_bytes_total', self.get_page_size(), kind=kind)
+                self.progress.add_fetch()
+                self.record_redirect(url, self.driver.current_url)
                 return True
             except Exception as e:
+                if attempt + 1 < max_retries:
+                    self.metrics.inc('inventory_fetch_retries_total')
                 print(f"Attempt {attempt + 1} failed to load {url}: {str(e)}")
                 time.sleep(2)
                 if "timeout" in str(e).lower():
@@ -438,7 +1259,18 @@ class InventoryChecker:
                         self.driver.set_page_load_timeout(self.page_load_timeout * 1.5)
                     except:
                         pass
+        self.metrics.inc('inventory_fetch_errors_total')
         return False
+        
+    def get_page_size(self):
+        """Bytes transferred for the current page, from the Navigation Timing API"""
+        try:
+            return self.driver.execute_script(
+                "const nav = performance.getEntriesByType('navigation')[0];"
+                "return nav ? (nav.transferSize || nav.encodedBodySize || 0) : 0;"
+            ) or 0
+        except Exception:
+            return 0
 
     def is_session_valid(self):
         """Check if the current session is valid"""
@@ -454,6 +1286,33 @@ class InventoryChecker:
         return self.driver.execute_script("""
             return document.body.innerText;
         """)
+
+    def get_page_links(self, link_selector='.elementor-button-wrapper a', card_selector='article[type-wines]'):
+        """Get title, href and text for every matching link in a single script call
+
+        Each entry also records whether the link sits inside a wine card, so
+        callers can choose between the card view and the plain button view
+        without another round trip to the browser.
+        """
+        links = self.driver.execute_script("""
+            var linkSelector = arguments[0], cardSelector = arguments[1];
+            var textOf = function (el) { return el ? (el.innerText || '').trim() : ''; };
+            var cards = Array.prototype.slice.call(document.querySelectorAll(cardSelector));
+            var results = [];
+            document.querySelectorAll(linkSelector).forEach(function (link) {
+                var article = link.closest('article');
+                var heading = article ? article.querySelector('.elementor-heading-title') : null;
+                var card = link.closest(cardSelector);
+                results.push({
+                    title: textOf(heading),
+                    href: link.href || '',
+                    text: textOf(link),
+                    card: card ? cards.indexOf(card) : -1
+                });
+            });
+            return results;
+        """, link_selector, card_selector)
+        return links or []
         
     def get_producer_page_url(self, producer):
         """Convert producer name to URL format"""
@@ -495,9 +1354,33 @@ class InventoryChecker:
             print(f"No URL mapping found for producer: {producer}")
             return []
             
+        if producer in self.resumed_producers:
+            products = [dict(product) for product in self.resumed_producers[producer]]
+            print(f"\nLoaded {len(products)} wines for {producer} from checkpoint")
+            self.metrics.inc('inventory_cache_lookups_total', cache='producer_listing', result='hit')
+            return products
+            
+        if self.snapshot is not None:
+            products = [dict(product) for product in self.snapshot['producers'].get(producer, [])]
+            print(f"\nLoaded {len(products)} wines for {producer} from snapshot")
+            self.metrics.inc('inventory_cache_lookups_total', cache='producer_listing', result='hit')
+            return products
+            
+        if producer in self.producer_products_cache:
+            products = [dict(product) for product in self.producer_products_cache[producer]]
+            print(f"\nUsing {len(products)} already loaded wines for {producer}")
+            self.metrics.inc('inventory_cache_lookups_total', cache='producer_listing', result='hit')
+            return products
+        self.metrics.inc('inventory_cache_lookups_total', cache='producer_listing', result='miss')
+            
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
+            
+        span = self.tracer.begin('producer_page', 'fetch', url=producer_url)
         try:
             print(f"\nChecking {producer_url}...")
-            if not self.safe_get_url(producer_url):
+            if not self.safe_get_url(producer_url, kind='producer'):
                 return []
                 
             print(f"Page title: {self.driver.title}")
@@ -514,59 +1397,160 @@ class InventoryChecker:
                     ))
                 )
                 
-                # Process wine elements
-                wine_elements = self.driver.find_elements(By.CSS_SELECTOR, 'article[type-wines]')
-                if wine_elements:
-                    for element in wine_elements:
-                        try:
-                            title = element.find_element(By.CSS_SELECTOR, '.elementor-heading-title').text
-                            if not title:
-                                continue
-                                
-                            view_btn = element.find_element(By.CSS_SELECTOR, '.elementor-button-wrapper a')
-                            url = view_btn.get_attribute('href')
-                            
-                            print(f"Found wine: {title}")
-                            products.append({
-                                'name': title,
-                                'url': url
-                            })
-                            
-                        except Exception as e:
-                            continue
+                links = self.get_page_links()
+                
+                # Process wine elements (first button in each wine card)
+                seen_cards = set()
+                for link in links:
+                    if link['card'] < 0 or link['card'] in seen_cards:
+                        continue
+                    seen_cards.add(link['card'])
+                    if not link['title']:
+                        continue
+                        
+                    print(f"Found wine: {link['title']}")
+                    products.append({
+                        'name': link['title'],
+                        'url': link['href']
+                    })
                 
                 # If no products found, try buttons approach
                 if not products:
                     print("Trying alternate approach with View Wine buttons...")
-                    buttons = self.driver.find_elements(By.CSS_SELECTOR, '.elementor-button-wrapper a')
-                    for button in buttons:
-                        try:
-                            container = button.find_element(By.XPATH, './ancestor::article')
-                            title = container.find_element(By.CSS_SELECTOR, '.elementor-heading-title').text
-                            url = button.get_attribute('href')
-                            
-                            if title and url:
-                                print(f"Found wine via button: {title}")
-                                products.append({
-                                    'name': title,
-                                    'url': url
-                                })
-                                
-                        except Exception:
-                            continue
+                    for link in links:
+                        if link['title'] and link['href']:
+                            print(f"Found wine via button: {link['title']}")
+                            products.append({
+                                'name': link['title'],
+                                'url': link['href']
+                            })
                             
             except TimeoutException:
                 print(f"Timeout waiting for products on {producer_url}")
                 
             print(f"\nFinished processing {producer}. Found {len(products)} wines.")
+            if products:
+                self.producer_products_cache[producer] = [dict(product) for product in products]
+                self.remember_listing(producer, products)
             return products
             
         except Exception as e:
             print(f"Error getting products for {producer}: {e}")
             return []
+            
+        finally:
+            self.tracer.end(span)
+
+    def load_saved_listings(self):
+        """Producer listings saved by earlier runs (see fast_mode)"""
+        if self.saved_listings is None:
+            self.saved_listings = load_json_file(self.listings_path, 'saved listings') or {}
+        return self.saved_listings
+        
+    def remember_listing(self, producer, products):
+        self.load_saved_listings()[producer] = {
+            'fetched': time.time(),
+            'products': [dict(product) for product in products]
+        }
+        self.listings_changed = True
+        
+    def save_listings(self):
+        """Write listings fetched in this run next to the older saved ones"""
+        if self.listings_changed and save_json_file(self.listings_path, self.saved_listings, 'saved listings'):
+            self.listings_changed = False
+            
+    def recent_listing(self, producer):
+        """A saved listing younger than listing_refresh, or None"""
+        entry = self.load_saved_listings().get(producer)
+        if entry and time.time() - entry['fetched'] < self.listing_refresh:
+            return [dict(product) for product in entry['products']]
+        return None
+        
+    def needs_discovery(self, producer_df):
+        """True if any of the producer's SKUs has no known URL to check"""
+        return any(
+            sku not in self.sku_url_mapping and sku not in self.learned_urls
+            for sku in producer_df['SKU']
+        )
+
+    def get_product_links(self, product_url):
+        """Load a product page and return its trade tool links (None if the page could not be loaded)"""
+        if self.snapshot is not None:
+            page = self.snapshot['products'].get(self.resolve_url(product_url))
+            return page['links'] if page else None
+            
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
+
+        with self.tracer.span('product_page', 'fetch', url=product_url):
+            if not self.safe_get_url(product_url, kind='product'):
+                return None
+
+            # Wait for trade tools to be present
+            try:
+                self.wait.until(
+                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, '.elementor-button-wrapper a'))
+                )
+            except TimeoutException:
+                return []
+
+            return [{'text': link['text'], 'href': link['href']} for link in self.get_page_links()]
 
     def check_product_details(self, product_url):
-        """Check if a product has all required assets with retry logic"""
+        """Check if a product has all required assets, loading each page once per run
+        
+        Results are memoized by canonical URL, so SKUs that share a page
+        (see allowed_duplicate_skus) reuse the first check. A check of a
+        page that another worker is already loading waits for that fetch
+        instead of starting its own.
+        """
+        key = self.resolve_url(product_url)
+        if key in self.url_memo:
+            self.fetch_stats['repeated'] += 1
+            self.metrics.inc('inventory_cache_lookups_total', cache='product_page', result='hit')
+            return dict(self.url_memo[key])
+
+        # Reuse results of a URL that was already checked in this batch or before an interruption
+        cached = self.product_details_cache.get(key) or self.resumed_url_results.get(key)
+        if cached is not None:
+            self.fetch_stats['cached'] += 1
+            self.metrics.inc('inventory_cache_lookups_total', cache='product_page', result='hit')
+            self.url_memo[key] = dict(cached)
+            return dict(cached)
+
+        with self.inflight_lock:
+            flight = self.inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = {'done': threading.Event(), 'results': None}
+                self.inflight[key] = flight
+
+        if not leader:
+            flight['done'].wait()
+            self.fetch_stats['shared'] += 1
+            self.metrics.inc('inventory_cache_lookups_total', cache='product_page', result='hit')
+            results = flight['results']
+        else:
+            try:
+                started = time.perf_counter()
+                results = self.fetch_product_details(key)
+                self.fetch_times[key] = time.perf_counter() - started
+                self.fetch_stats['fetched'] += 1
+                self.metrics.inc('inventory_cache_lookups_total', cache='product_page', result='miss')
+                flight['results'] = results
+            finally:
+                if flight['results'] is None:
+                    flight['results'] = {column: False for column in ASSET_COLUMNS}
+                flight['done'].set()
+                with self.inflight_lock:
+                    del self.inflight[key]
+
+        self.url_memo[key] = dict(results)
+        return dict(results)
+
+    def fetch_product_details(self, product_url):
+        """Load a product page (by its resolved URL) and check which asset buttons it has"""
         results = {
             'Has Spec Sheet': False,
             'Has Shelf-Talker': False,
@@ -574,55 +1558,211 @@ class InventoryChecker:
             'Has Bottle Shot': False
         }
 
-        if not self.safe_get_url(product_url):
-            return results
-
         try:
-            # Wait for trade tools to be present
-            try:
-                trade_tools = self.wait.until(
-                    EC.presence_of_all_elements_located((By.CSS_SELECTOR, '.elementor-button-wrapper a'))
-                )
-            except TimeoutException:
+            trade_tools = self.get_product_links(product_url)
+            if trade_tools is None:
                 return results
 
+            tool_map = {
+                'spec sheet': 'Has Spec Sheet',
+                'shelf-talker': 'Has Shelf-Talker',
+                'hi-res label': 'Has Hi-Res Label',
+                'bottle shot': 'Has Bottle Shot'
+            }
+
             # Instead of clicking, we'll check the href attributes directly
             for tool in trade_tools:
-                try:
-                    tool_text = tool.text.strip().lower()
-                    href = tool.get_attribute('href')
-                    
-                    if not href:
-                        continue
-                        
-                    tool_map = {
-                        'spec sheet': 'Has Spec Sheet',
-                        'shelf-talker': 'Has Shelf-Talker',
-                        'hi-res label': 'Has Hi-Res Label',
-                        'bottle shot': 'Has Bottle Shot'
-                    }
-
-                    for text, key in tool_map.items():
-                        if text in tool_text:
-                            # If we find a matching button with an href, consider it available
-                            results[key] = True
-                            break
-
-                except Exception:
+                tool_text = tool['text'].lower()
+                if not tool['href']:
                     continue
+                    
+                for text, key in tool_map.items():
+                    if text in tool_text:
+                        # If we find a matching button with an href, consider it available
+                        results[key] = True
+                        break
 
+            # A page without any trade tools may have timed out before they
+            # loaded, so it is not cached and gets loaded again next time
+            if trade_tools:
+                self.product_details_cache[product_url] = dict(results)
             return results
 
         except Exception as e:
             print(f"Error checking product details at {product_url}: {e}")
             return results
 
+    def print_fetch_summary(self):
+        """Print how many product page loads the run needed and avoided"""
+        stats = self.fetch_stats
+        avoided = stats['repeated'] + stats['shared'] + stats['cached']
+        if not stats['fetched'] and not avoided and not stats['listings_reused']:
+            return
+        print(f"\nProduct pages: {stats['fetched']} loaded, {avoided} loads avoided "
+              f"({stats['repeated']} repeated in this run, {stats['shared']} shared with a concurrent check, "
+              f"{stats['cached']} cached or resumed)")
+        if stats['listings_reused']:
+            print(f"Producer pages: {stats['listings_reused']} crawls skipped using saved listings (fast mode)")
+
+    def get_asset_metadata(self, asset_url):
+        """Get status, type and size of an asset link with a HEAD request"""
+        import requests
+        try:
+            started = time.perf_counter()
+            with self.tracer.span('head_probe', 'fetch', url=asset_url):
+                response = requests.head(asset_url, timeout=5, allow_redirects=True)
+            self.metrics.observe('inventory_fetch_seconds', time.perf_counter() - started, kind='asset_head')
+            self.metrics.inc('inventory_pages_fetched_total', kind='asset_head')
+            self.progress.add_fetch()
+            return {
+                'status': response.status_code,
+                'content_type': response.headers.get('Content-Type', ''),
+                'content_length': response.headers.get('Content-Length', '')
+            }
+        except Exception:
+            return {'status': None, 'content_type': '', 'content_length': ''}
+
+    def create_snapshot(self, snapshot_path):
+        """Crawl all producer listings, product pages and asset links into a compressed archive"""
+        print("\nCreating site snapshot...")
+        snapshot = {
+            'version': 1,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'base_url': self.base_url,
+            'producers': {},
+            'products': {},
+            'assets': {}
+        }
+        
+        # Mapped URLs are included even if no producer listing links to them
+        product_urls = {self.resolve_url(url) for url in self.sku_url_mapping.values() if url and url != 'NO_MATCH'}
+        
+        try:
+            if self.driver is None:
+                self.setup_selenium()
+                
+            for producer in self.producers:
+                products = self.get_producer_products(producer)
+                snapshot['producers'][producer] = products
+                product_urls.update(self.resolve_url(product['url']) for product in products if product['url'])
+                
+            print(f"\nCrawling {len(product_urls)} product pages...")
+            for product_url in sorted(product_urls):
+                links = self.get_product_links(product_url)
+                if links is None:
+                    print(f"Could not load {product_url}, leaving it out of the snapshot")
+                    continue
+                snapshot['products'][product_url] = {'links': links}
+                
+                for link in links:
+                    if link['href'] and link['href'] not in snapshot['assets']:
+                        snapshot['assets'][link['href']] = self.get_asset_metadata(link['href'])
+        finally:
+            if self.driver:
+                self.driver.quit()
+                self.driver = None
+                
+        with gzip.open(snapshot_path, 'wt', encoding='utf-8') as f:
+            json.dump(snapshot, f)
+            
+        print(f"\nSnapshot saved to {snapshot_path}")
+        print(f"- Producers: {len(snapshot['producers'])}")
+        print(f"- Product pages: {len(snapshot['products'])}")
+        print(f"- Asset links: {len(snapshot['assets'])}")
+        return True
+
+    def load_snapshot(self, snapshot_path):
+        """Load a site snapshot so all website checks are answered offline"""
+        with gzip.open(snapshot_path, 'rt', encoding='utf-8') as f:
+            self.snapshot = json.load(f)
+        # Older snapshots were keyed by the URLs as scraped
+        self.snapshot['products'] = {
+            self.resolve_url(url): page for url, page in self.snapshot['products'].items()
+        }
+        print(f"\nUsing site snapshot {snapshot_path} (created {self.snapshot['created']})")
+        
+    def cancel(self):
+        """Ask a running process_inventory to stop after the current fetch"""
+        self.cancel_event.set()
+        
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+        
+    def get_checkpoint_path(self, pdf_path):
+        """Checkpoint file used for a PDF"""
+        name = os.path.splitext(os.path.basename(pdf_path))[0]
+        return os.path.join(self.checkpoint_dir, f"inventory_checkpoint_{name}.jsonl")
+        
+    def open_checkpoint(self, pdf_path):
+        """Start the checkpoint journal, loading completed work first when resuming"""
+        self.checkpoint_path = self.get_checkpoint_path(pdf_path)
+        self.resumed_rows = {}
+        self.resumed_producers = {}
+        self.resumed_url_results = {}
+        self.resumed_methods = {}
+        
+        if self.resume and os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path, encoding='utf-8') as f:
+                content = f.read()
+            for line in content.splitlines():
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Partially written last line
+                if entry['type'] == 'sku':
+                    self.resumed_rows[entry['sku']] = entry['values']
+                    if entry.get('method'):
+                        self.resumed_methods[entry['sku']] = entry['method']
+                    url = entry['values'].get('Product URL')
+                    if url:
+                        self.resumed_url_results[self.resolve_url(url)] = {
+                            key: entry['values'][key]
+                            for key in ['Has Spec Sheet', 'Has Shelf-Talker', 'Has Hi-Res Label', 'Has Bottle Shot']
+                        }
+                elif entry['type'] == 'producer':
+                    self.resumed_producers[entry['producer']] = entry['products']
+            print(f"\nResuming from {self.checkpoint_path}: {len(self.resumed_rows)} SKUs and "
+                  f"{len(self.resumed_producers)} producers already checked")
+            self.checkpoint_file = open(self.checkpoint_path, 'a', encoding='utf-8')
+            if content and not content.endswith('\n'):
+                self.checkpoint_file.write('\n')  # Start after a partially written line
+        else:
+            if self.resume:
+                print(f"\nNo checkpoint found at {self.checkpoint_path}, starting a new run")
+            self.checkpoint_file = open(self.checkpoint_path, 'w', encoding='utf-8')
+            self.write_checkpoint({'type': 'run', 'pdf': os.path.abspath(pdf_path), 'started': datetime.now().isoformat(timespec='seconds')})
+            
+    def write_checkpoint(self, entry):
+        """Append one entry to the checkpoint journal"""
+        if self.journal_buffer is not None:
+            self.journal_buffer.append(entry)  # Worker process; the parent writes the journal
+        elif self.checkpoint_file:
+            self.checkpoint_file.write(json.dumps(entry) + '\n')
+            self.checkpoint_file.flush()
+            
+    def close_checkpoint(self, completed):
+        """Close the journal, removing it once the run has finished"""
+        if self.checkpoint_file:
+            self.checkpoint_file.close()
+            self.checkpoint_file = None
+        if completed and self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+        elif self.checkpoint_path:
+            print(f"\nProgress saved to {self.checkpoint_path}. Run again with --resume to continue.")
+        self.checkpoint_path = None
+
     def set_progress_callback(self, callback_function):
         """Set a callback function to report progress
         Callback should accept (current, total, producer) parameters
         """
         self.progress_callback = callback_function
         
+    def report_progress(self, current, total, producer=None):
+        """Update the progress state and notify the callback if one is set"""
+        self.progress.update(current, total, producer)
+        if self.progress_callback:
+            self.progress_callback(current, total, producer)
+        
     def detect_varietal(self, text):
         """Detect the varietal from product name or URL"""
         text = text.lower()
@@ -648,14 +1788,19 @@ class InventoryChecker:
             
         return False
 
-    def check_duplicate_urls(self):
-        """Check if any URL is assigned to multiple SKUs that aren't allowed to be duplicates"""
+    def check_duplicate_urls(self, follow_redirects=False):
+        """Check if any URL is assigned to multiple SKUs that aren't allowed to be duplicates
+        
+        URLs are compared in canonical form, or with follow_redirects after
+        applying the redirects seen on earlier runs.
+        """
         url_to_skus = {}
         duplicates = []
         
         # Find all non-empty URLs in mapping
         for sku, url in self.sku_url_mapping.items():
             if url and url != 'NO_MATCH':
+                url = self.resolve_url(url) if follow_redirects else canonical_url(url, self.base_url)
                 if url in url_to_skus:
                     url_to_skus[url].append(sku)
                 else:
@@ -695,164 +1840,346 @@ class InventoryChecker:
         return sku, None  # No clear vintage part
         
     def learn_url_patterns(self):
-        """Learn URL patterns from existing SKU-URL mappings"""
-        print("\nLearning URL patterns from existing mappings...")
-        vintage_patterns = {}
+        """Learn a URL slug template for every SKU family in the SKU-URL mappings
         
-        # Group SKUs by their base part
+        A mapping whose slug contains the SKU's vintage year becomes a
+        template for its base SKU (the SKU without the vintage), with the
+        year replaced and any WordPress '-2' suffix dropped. Families with
+        mappings that differ beyond the year keep each template, newest
+        vintage first.
+        """
+        print("\nLearning URL patterns from existing mappings...")
+        self.url_patterns = {}
+        examples = 0
         for sku, url in self.sku_url_mapping.items():
             if url == 'NO_MATCH':
                 continue
-                
             base_sku, vintage = self.extract_sku_components(sku)
-            if not vintage:
+            words, year, tail = self.slug_parts(url)
+            if not vintage or year != f"20{vintage}":
                 continue
-                
-            # Store this mapping
-            if base_sku not in vintage_patterns:
-                vintage_patterns[base_sku] = []
-                
-            vintage_patterns[base_sku].append((vintage, url))
+            pattern = self.url_patterns.setdefault(base_sku, {'templates': [], 'vintages': []})
+            pattern['templates'].append((vintage, '-'.join(words + ['{year}'] + tail)))
+            pattern['vintages'].append(vintage)
+            examples += 1
+            
+        for pattern in self.url_patterns.values():
+            templates = []
+            for _, template in sorted(pattern['templates'], reverse=True):
+                if template not in templates:
+                    templates.append(template)
+            pattern['templates'] = templates
+        print(f"  Learned URL templates for {len(self.url_patterns)} SKU families from {examples} mappings")
         
-        # Analyze patterns for each base SKU
-        for base_sku, vintage_urls in vintage_patterns.items():
-            if len(vintage_urls) < 2:
-                continue  # Need at least 2 examples to establish a pattern
-                
-            # Sort by vintage
-            vintage_urls.sort(key=lambda x: x[0])
-            
-            # Check if URLs follow a consistent pattern
-            pattern_found = False
-            for i in range(len(vintage_urls) - 1):
-                vintage1, url1 = vintage_urls[i]
-                vintage2, url2 = vintage_urls[i + 1]
-                
-                # Try to find vintage in URL
-                url1_parts = url1.split('-')
-                url2_parts = url2.split('-')
-                
-                if len(url1_parts) != len(url2_parts):
-                    continue
-                
-                # Check which part changes with vintage
-                diff_index = None
-                for j, (part1, part2) in enumerate(zip(url1_parts, url2_parts)):
-                    if part1 != part2:
-                        if diff_index is None:
-                            diff_index = j
-                        else:
-                            # More than one part differs - not a simple pattern
-                            diff_index = None
-                            break
+    def slug_parts(self, url):
+        """Split a product URL's slug into (words, year, tail)
+        
+        The year is the last 4-digit year or 'nv', the tail holds bottle
+        sizes after it ('375-ml'), and a WordPress duplicate suffix ('-2')
+        is dropped. year is None for slugs without one.
+        """
+        tokens = urlsplit(url).path.strip('/').split('/')[-1].split('-')
+        if len(tokens) > 2 and len(tokens[-1]) == 1 and tokens[-1].isdigit():
+            tokens = tokens[:-1]
+        for position in range(len(tokens) - 1, -1, -1):
+            if tokens[position] == 'nv' or re.fullmatch(r'(19|20)\d\d', tokens[position]):
+                return tokens[:position], tokens[position], tokens[position + 1:]
+        return tokens, None, []
+        
+    def description_tokens(self, description, producer):
+        """Words of an inventory description that can appear in a slug (no producer name, sizes or numbers)"""
+        name = set(slug_tokens(producer))
+        return [
+            token for token in slug_tokens(description)
+            if len(token) > 1 and token not in name and not any(char.isdigit() for char in token)
+        ]
+        
+    def learn_slug_vocabulary(self, inventory_df):
+        """Learn how descriptions turn into slugs from the mapped SKUs of an inventory
+        
+        For each producer this finds the slug prefix its URLs start with.
+        Across all producers it learns which description words are abbreviations of
+        slug words ('CAB' -> 'cabernet') and which never appear in a slug
+        (regions, countries).
+        """
+        prefixes = {}
+        expansions = {}
+        seen = Counter()
+        used = Counter()
+        rows = zip(inventory_df['SKU'], inventory_df['Producer'], inventory_df['Full Description'])
+        for sku, producer, description in rows:
+            url = self.sku_url_mapping.get(sku)
+            if not url or url == 'NO_MATCH' or producer == 'UNKNOWN':
+                continue
+            words, _, _ = self.slug_parts(url)
+            name = slug_tokens(producer)
+            shared = 0
+            while shared < min(len(name), len(words)) and words[shared] == name[shared]:
+                shared += 1
+            if not shared:
+                continue
+            prefixes.setdefault(producer, Counter())['-'.join(words[:shared])] += 1
+            product_words = words[shared:]
+            for token in self.description_tokens(description, producer):
+                seen[token] += 1
+                matches = [word for word in product_words if word.startswith(token)]
+                if matches:
+                    used[token] += 1
+                    expansions.setdefault(token, Counter())[matches[0]] += 1
+                    
+        self.slug_vocabulary = {
+            'prefixes': {producer: counts.most_common(1)[0][0] for producer, counts in prefixes.items()},
+            'expansions': {token: counts.most_common(1)[0][0] for token, counts in expansions.items()},
+            'dropped': sorted(token for token, count in seen.items() if count >= 2 and not used[token]),
+        }
+        
+    def slug_candidates(self, row, vintage):
+        """Slugs built from an inventory line: producer prefix + product words + year (+ size)"""
+        producer = row['Producer']
+        if producer == 'UNKNOWN':
+            return []
+        vocabulary = self.slug_vocabulary
+        description = row['Full Description']
+        # The description's own year wins over the SKU's last digits
+        year = description_year(description)
+        if year is None:
+            year = f"20{vintage}" if vintage else ('nv' if 'N/V' in description.upper() else None)
+        tail = ['375', 'ml'] if re.search(r'/375\b|375\s*ML', description.upper()) else []
+        
+        prefix = vocabulary['prefixes'].get(producer) or '-'.join(slug_tokens(producer))
+        words = []
+        for token in self.description_tokens(description, producer):
+            if token in vocabulary['dropped']:
+                continue
+            word = vocabulary['expansions'].get(token, token)
+            if word not in words:
+                words.append(word)
                 
-                if diff_index is not None:
-                    # Check if the different part contains the vintage
-                    if f"20{vintage1}" in url1_parts[diff_index] and f"20{vintage2}" in url2_parts[diff_index]:
-                        # Found a pattern! Store it
-                        pattern = url1_parts.copy()
-                        pattern[diff_index] = f"YEAR_PLACEHOLDER"
-                        pattern_str = '-'.join(pattern)
-                        
-                        self.url_patterns[base_sku] = {
-                            'pattern': pattern_str,
-                            'examples': vintage_urls,
-                            'year_format': "20{vintage}",
-                            'position': diff_index,
-                            'vintages': [v for v, _ in vintage_urls]
-                        }
-                        
-                        print(f"  Learned pattern for {base_sku}: {vintage1}→{vintage2} maps to {pattern_str}")
-                        pattern_found = True
-                        break
-            
-            if pattern_found:
-                self.url_patterns[base_sku]['vintages'] = [v for v, _ in vintage_urls]
-    
-    def predict_url_from_pattern(self, sku):
-        """Predict URL for a new vintage based on patterns from previous vintages"""
-        base_sku, vintage = self.extract_sku_components(sku)
+        # Slugs usually name the wine before the varietal ('camino-africana-chardonnay'),
+        # while descriptions often lead with it, so both orders are tried. Every
+        # product word is kept: a shorter slug can be a sibling wine's page
+        # ('downes-family-merlot' for a Mt Bullet Merlot), so those SKUs are
+        # left to name matching instead.
+        varietal_words = {word for term in self.varietal_terms.items() for word in slug_tokens(' '.join(term))}
+        varietal_last = [word for word in words if word not in varietal_words] + [word for word in words if word in varietal_words]
+        slugs = []
+        for product_words in (varietal_last, words):
+            slug = '-'.join([prefix] + product_words + ([year] if year else []) + tail)
+            if product_words and slug not in slugs:
+                slugs.append(slug)
+        return slugs
         
-        # Check if we already predicted this URL
-        if sku in self.learned_urls:
-            return self.learned_urls[sku]
-            
-        if not vintage or base_sku not in self.url_patterns:
-            return None
-            
-        # Get the pattern
-        pattern_info = self.url_patterns[base_sku]
+    def unavailable_urls(self, sku, used_urls=()):
+        """URLs a prediction for a SKU must not return: used in this run or mapped to another SKU"""
+        taken = {
+            self.resolve_url(url) for other, url in self.sku_url_mapping.items()
+            if other != sku and url and url != 'NO_MATCH'
+        }
+        taken.update(used_urls)
+        return taken
+        
+    def candidate_urls(self, sku, row=None, taken=()):
+        """Ranked (url, source) candidates for a SKU without a mapping
         
-        # Check if we've already seen this vintage
-        if vintage in pattern_info['vintages']:
-            return None  # This should already be in our manual mappings
+        Templates of the SKU's family come first (source 'template'),
+        then slugs built from its inventory line (source 'slug'). URLs in
+        taken are left out.
+        """
+        base_sku, vintage = self.extract_sku_components(sku)
+        if row is not None and vintage and description_year(row['Full Description']) not in (None, f"20{vintage}"):
+            # The SKU's last digits are not its vintage (S1ALMMA2275 is a 2022 wine),
+            # so it has no family templates and its slugs take the described year
+            vintage = None
+        slugs = []
+        pattern = self.url_patterns.get(base_sku)
+        if pattern and vintage and vintage not in pattern['vintages']:
+            slugs += [(template.format(year=f"20{vintage}"), 'template') for template in pattern['templates']]
+        if row is not None:
+            slugs += [(slug, 'slug') for slug in self.slug_candidates(row, vintage)]
             
-        # Create the predicted URL
-        pattern = pattern_info['pattern']
-        year_format = pattern_info['year_format'].format(vintage=vintage)
+        candidates = []
+        for slug, source in slugs:
+            url = self.resolve_url(f"{self.base_url}/wines/{slug}/")
+            if url not in taken and url not in (candidate for candidate, _ in candidates):
+                candidates.append((url, source))
+        return candidates
         
-        url_parts = pattern.split('-')
-        url_parts[pattern_info['position']] = year_format
-        predicted_url = '-'.join(url_parts)
+    def predict_url_from_pattern(self, sku, row=None, probe_slugs=False, used_urls=()):
+        """Find the URL of an unmapped SKU from its ranked candidate URLs
         
-        # Add the base URL if needed
-        if not predicted_url.startswith('http'):
-            predicted_url = f"{self.base_url}/wines/{predicted_url}/"
+        Candidates are first looked up in the loaded producer listings (or
+        the snapshot), which costs nothing. Otherwise the first few are
+        checked with HEAD requests: template candidates always, slugs built
+        from the description only with probe_slugs (when no listing has
+        been loaded to match against). URLs in used_urls or mapped to
+        another SKU are never returned.
+        """
+        taken = self.unavailable_urls(sku, used_urls)
+        # Check if we already predicted this URL
+        if sku in self.learned_urls:
+            url = self.learned_urls[sku]
+            return url if url not in taken else None
             
-        print(f"  Predicted URL for {sku}: {predicted_url}")
+        candidates = self.candidate_urls(sku, row, taken)
+        for url, _ in candidates:
+            # WordPress gives a page with a taken slug a "-2" suffix
+            if url not in self.known_urls:
+                url = self.suffixed_variant(url) or url
+            if url in taken:
+                continue
+            if url in self.known_urls:
+                print(f"  Predicted URL for {sku} exists in producer listing: {url}")
+                self.learned_urls[sku] = url
+                return url
+            if self.snapshot is not None and url in self.snapshot['products']:
+                print(f"  Predicted URL for {sku} exists in snapshot: {url}")
+                self.learned_urls[sku] = url
+                return url
+                
+        if self.snapshot is None and sku not in self.unverified_skus:
+            probes = [url for url, source in candidates if source == 'template' or probe_slugs]
+            for url in probes[:self.max_url_probes]:
+                verified = self.probe_url(url)
+                if verified and verified not in taken:
+                    print(f"  Verified predicted URL for {sku}: {verified}")
+                    self.learned_urls[sku] = verified
+                    return verified
+                    
+        if candidates and sku not in self.unverified_skus:
+            print(f"  No predicted URL verified for {sku} ({len(candidates)} candidates)")
+        self.unverified_skus.add(sku)  # Not probed again in this run
+        return None
         
-        # Verify the URL exists
+    def predict_unmapped_urls(self, producer_df):
+        """Try candidate URLs for a producer's unmapped SKUs before crawling its listing"""
+        for _, row in producer_df.iterrows():
+            if self.is_cancelled():
+                return
+            if row['SKU'] not in self.sku_url_mapping:
+                self.predict_url_from_pattern(row['SKU'], row, probe_slugs=True)
+                
+    def probe_url(self, url):
+        """HEAD-request a URL; returns its resolved URL if the page exists, else None"""
+        import requests
         try:
-            # First try a lightweight HEAD request
-            response = requests.head(predicted_url, timeout=5)
+            started = time.perf_counter()
+            with self.tracer.span('head_probe', 'fetch', url=url):
+                response = requests.head(url, timeout=5, allow_redirects=True)
+            self.metrics.observe('inventory_fetch_seconds', time.perf_counter() - started, kind='pattern_head')
+            self.metrics.inc('inventory_pages_fetched_total', kind='pattern_head')
+            self.progress.add_fetch()
             if response.status_code == 200:
-                print(f"  Verified URL exists: {predicted_url}")
-                self.learned_urls[sku] = predicted_url
-                return predicted_url
-        except:
+                self.record_redirect(url, response.url)
+                return self.resolve_url(url)
+        except Exception:
             pass
-            
         return None
 
-    def process_inventory(self, pdf_path):
-        """Process inventory from PDF and check against website"""
+    def close_driver(self):
+        """Quit the browser if one is running"""
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+            
+    def process_inventory(self, pdf_path, output_file=None):
+        """Process inventory from PDF and check against website
+        
+        Each run starts a fresh trace, which is summarized (and saved to
+        trace_path) however the run ends, and with profile its stage
+        profiles are saved on every exit too.
+        """
+        self.tracer = Tracer()
+        self.profiler = StageProfiler() if self.profile else None
+        self.output_file = None  # Names the profile folder, so none from an earlier run
+        try:
+            return self.run_inventory_check(pdf_path, output_file)
+        finally:
+            self.finish_trace()
+            self.finish_profile()
+            
+    def run_inventory_check(self, pdf_path, output_file=None):
+        """The steps of process_inventory, from reading the PDF to writing the report"""
         print("\nProcessing inventory...")
+        run_started = time.perf_counter()
+        self.progress.reset()
+        self.cancel_event.clear()
+        self.url_memo = {}
+        self.fetch_stats = Counter()
+        self.match_methods = {}
+        self.fetch_times = {}
         current_date = datetime.now().strftime('%m%d%y')
         self.current_date = current_date
         
-        # Learn URL patterns from existing SKU-URL mappings
-        self.learn_url_patterns()
-        
-        # Check for duplicate URL mappings before starting
-        duplicates = self.check_duplicate_urls()
-        if duplicates:
-            print("\nWARNING: Found duplicate URL mappings:")
-            for url, skus in duplicates:
-                print(f"  URL: {url}")
-                print(f"  SKUs: {', '.join(skus)}")
-            print("\nPlease fix duplicate mappings before continuing.")
-            return False
+        if not self.mappings_checked:
+            # Learn URL patterns from existing SKU-URL mappings
+            with self.tracer.span('learn_url_patterns'):
+                self.learn_url_patterns()
+            
+            # Check for duplicate URL mappings before starting
+            with self.tracer.span('check_duplicate_urls'):
+                duplicates = self.check_duplicate_urls()
+            if duplicates:
+                print("\nWARNING: Found duplicate URL mappings:")
+                for url, skus in duplicates:
+                    print(f"  URL: {url}")
+                    print(f"  SKUs: {', '.join(skus)}")
+                print("\nPlease fix duplicate mappings before continuing.")
+                self.progress.set_stage('Failed')
+                self.record_run(run_started, 'failed')
+                return False
+                
+            # Different mapped pages that the site now redirects to one page
+            # are checked as that page; they only need a look, not a fix first
+            redirected = self.check_duplicate_urls(follow_redirects=True)
+            if redirected:
+                print("\nWARNING: Mapped URLs that now redirect to the same page:")
+                for url, skus in redirected:
+                    print(f"  URL: {url}")
+                    print(f"  SKUs: {', '.join(skus)}")
+            self.mappings_checked = True
         
         # Extract data from PDF
-        inventory_df = self.extract_pdf_data(pdf_path)
+        self.progress.set_stage('Reading PDF')
+        with self.tracer.span('extract_pdf_data', pdf=os.path.basename(pdf_path)), self.profile_stage('extract_pdf_data'):
+            inventory_df = self.extract_pdf_data(pdf_path)
         if inventory_df is None or inventory_df.empty:
             print("Error: No data extracted from PDF!")
+            self.progress.set_stage('Failed')
+            self.record_run(run_started, 'failed')
             return False
             
-        # Setup webdriver
-        if self.driver is None:
-            self.setup_selenium()
+        # Learn how this inventory's descriptions map to URL slugs
+        with self.tracer.span('learn_slug_vocabulary'):
+            self.learn_slug_vocabulary(inventory_df)
+        self.unverified_skus = set()
+            
+        # Journal completed checks so an interrupted run can be resumed
+        self.open_checkpoint(pdf_path)
+            
+        # Setup webdriver (not needed when replaying a snapshot, and each
+        # worker process starts its own)
+        if self.driver is None and self.snapshot is None and self.processes <= 1:
+            self.progress.set_stage('Setting up browser')
+            with self.profile_stage('setup_selenium'):
+                self.setup_selenium()
         
         # Process by producer for more accurate results
         print("\nChecking products on website...")
+        inventory_df.loc[inventory_df['Producer'] == "UNKNOWN", 'Check Status'] = 'Unknown producer'
         
-        # Get all unique producers
-        unique_producers = inventory_df['Producer'].unique()
-        producers = [p for p in unique_producers if p != "UNKNOWN"]
+        # Check the most valuable producers first, so a run cut short by
+        # the deadline or a cancel leaves the least important gaps
+        with self.tracer.span('schedule_producers'):
+            schedule = self.schedule_producers(inventory_df)
+        deadline_hit = False
         
         # Count of relevant products for progress tracking
         products_total = len(inventory_df[inventory_df['Producer'] != "UNKNOWN"])
         products_checked = 0
+        self.progress.set_stage('Checking products', products_total)
         
         # Create a dictionary to track all website products
         all_website_products = {}
@@ -860,38 +2187,312 @@ class InventoryChecker:
         # Create a dictionary to track URL usage
         used_urls = set()
         
-        # For each producer
-        for producer in producers:
-            print(f"\nProcessing {producer} products...")
+        with self.profile_stage('check_products'):
+            if self.processes > 1 and len(schedule) > 1:
+                self.check_producers_in_processes(inventory_df, schedule, used_urls, all_website_products, products_total)
+            else:
+                # For each producer
+                for producer, producer_df in schedule:
+                    if self.is_cancelled():
+                        break
+                    if self.deadline_reached():
+                        deadline_hit = True
+                        break
+                        
+                    # Store website products for later comparison
+                    all_website_products[producer] = self.check_producer(
+                        inventory_df, producer, producer_df, used_urls, products_checked, products_total
+                    )
+                    products_checked += len(producer_df)
+            
+        self.save_listings()
+        self.save_redirects()
+        if self.deadline_reached():
+            deadline_hit = True
+        if deadline_hit and not self.is_cancelled():
+            not_checked = int((inventory_df['Check Status'] == 'Not checked').sum())
+            print(f"\nDeadline reached: {not_checked} SKUs were not checked and are marked 'Not checked' in the report.")
             
-            # Get all products for this producer
-            producer_df = inventory_df[inventory_df['Producer'] == producer]
+        if self.is_cancelled():
+            print("\nRun cancelled.")
+            self.close_checkpoint(completed=False)
+            self.progress.set_stage('Cancelled')
+            if not self.keep_driver_open:
+                self.close_driver()
+            self.record_run(run_started, 'cancelled')
+            return False
+        
+        # Find website products not in inventory
+        with self.tracer.span('find_website_only_products'), self.profile_stage('find_website_only_products'):
+            website_only_df = self.find_website_only_products(all_website_products, used_urls)
+        
+        # Generate Excel report
+        self.progress.set_stage('Creating report')
+        with self.tracer.span('generate_excel_report'), self.profile_stage('generate_excel_report'):
+            success = self.generate_excel_report(inventory_df, website_only_df, output_file)
+        if success:
+            self.record_history(pdf_path, inventory_df)
+        if not self.keep_driver_open:
+            self.close_driver()
             
-            # Get producer products from website
-            website_products = self.get_producer_products(producer)
+        # Keep the results for batch consolidation
+        self.last_inventory_df = inventory_df
+        self.last_website_only_df = website_only_df
+        self.progress.set_stage('Complete' if success else 'Failed')
+        self.close_checkpoint(completed=success and not deadline_hit)
             
-            # Store website products for later comparison
-            all_website_products[producer] = website_products
+        self.print_fetch_summary()
+        self.record_run(run_started, 'success' if success else 'failed')
+        return success
+        
+    def check_producer(self, inventory_df, producer, producer_df, used_urls, products_checked, products_total):
+        """Load one producer's listing and check its SKUs; returns the listing"""
+        print(f"\nProcessing {producer} products...")
+        
+        with self.tracer.span(f"producer: {producer}", 'producer'):
+            # Get producer products from website. In fast mode a producer
+            # whose SKUs are all mapped only needs its listing for the
+            # Website Only sheet, so a recent saved one is good enough.
+            # Candidate URLs verified with a few HEAD requests count as mapped.
+            website_products = None
+            if self.fast_mode and producer not in self.resumed_producers and self.needs_discovery(producer_df):
+                self.predict_unmapped_urls(producer_df)
+            if self.fast_mode and producer not in self.resumed_producers and not self.needs_discovery(producer_df):
+                website_products = self.recent_listing(producer)
+                if website_products is not None:
+                    print(f"All {producer} SKUs are mapped, using the saved listing ({len(website_products)} wines)")
+                    self.fetch_stats['listings_reused'] += 1
+                    self.metrics.inc('inventory_cache_lookups_total', cache='saved_listing', result='hit')
+            if website_products is None:
+                website_products = self.get_producer_products(producer)
+            for product in website_products:
+                product['url'] = self.resolve_url(product['url'])
+                self.known_urls.add(product['url'])
+            if producer not in self.resumed_producers:
+                self.write_checkpoint({'type': 'producer', 'producer': producer, 'products': website_products})
             
             # Process products for this producer
             self.process_producer_products(inventory_df, producer_df, website_products, used_urls, products_checked, products_total)
-            products_checked += len(producer_df)
+        return website_products
         
-        # Find website products not in inventory
-        website_only_df = self.find_website_only_products(all_website_products, used_urls)
+    def check_producers_in_processes(self, inventory_df, schedule, used_urls, all_website_products, products_total):
+        """Check producers in a pool of worker processes, each with its own browser
         
-        # Generate Excel report
-        return self.generate_excel_report(inventory_df, website_only_df)
+        Producers are queued in schedule order and handed to whichever
+        worker is free. Each finished producer's rows, URLs, journal
+        entries and cache updates are merged back into this checker, so
+        the rest of the run sees the same state as a sequential run.
+        """
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+        
+        processes = min(self.processes, len(schedule))
+        print(f"\nChecking {len(schedule)} producers in {processes} worker processes...")
+        self.resolve_url(self.base_url)  # Load the redirect map so workers start with it
+        state = {name: getattr(self, name) for name in SHARD_STATE}
+        stop_event = multiprocessing.Event()
+        products_checked = 0
+        
+        with ProcessPoolExecutor(processes, initializer=init_shard_worker, initargs=(state, self.tracer.origin, stop_event)) as pool:
+            pending = {
+                pool.submit(check_producer_shard, producer, producer_df)
+                for producer, producer_df in schedule
+            }
+            while pending:
+                done, pending = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                if self.is_cancelled() and not stop_event.is_set():
+                    # Queued producers are dropped, running ones stop after their current fetch
+                    stop_event.set()
+                    for future in pending:
+                        future.cancel()
+                for future in done:
+                    if future.cancelled():
+                        continue
+                    try:
+                        shard = future.result()
+                    except Exception as e:
+                        print(f"Error in producer worker: {e}")
+                        continue
+                    self.merge_shard(inventory_df, shard, used_urls, all_website_products)
+                    products_checked += shard['rows']
+                    self.report_progress(products_checked, products_total, shard['producer'])
+                    
+    def merge_shard(self, inventory_df, shard, used_urls, all_website_products):
+        """Fold the results of one producer checked in a worker process into this run"""
+        with self.tracer.lock:
+            self.tracer.events.extend(shard['trace_events'])
+        self.metrics.merge(shard['metrics'])
+        if shard['website_products'] is None:
+            return  # Stopped (cancel or deadline) before the producer was started
+            
+        results = shard['results']
+        for column in results.columns:
+            inventory_df.loc[results.index, column] = results[column]
+        used_urls.update(shard['used_urls'])
+        all_website_products[shard['producer']] = shard['website_products']
+        self.known_urls.update(product['url'] for product in shard['website_products'])
+        
+        for entry in shard['journal']:
+            self.write_checkpoint(entry)
+        self.fetch_stats.update(shard['fetch_stats'])
+        self.match_methods.update(shard['match_methods'])
+        self.fetch_times.update(shard['fetch_times'])
+        self.learned_urls.update(shard['learned_urls'])
+        if shard['redirects']:
+            self.redirects.update(shard['redirects'])
+            self.redirects_changed = True
+        if shard['listings']:
+            self.load_saved_listings().update(shard['listings'])
+            self.listings_changed = True
+        
+    def deadline_reached(self):
+        """True once there is only deadline_reserve seconds left to write the report"""
+        return self.deadline is not None and time.time() >= self.deadline - self.deadline_reserve
+        
+    def has_fresh_listing(self, producer):
+        """True if the producer's product listing is already loaded"""
+        return (
+            producer in self.resumed_producers
+            or self.snapshot is not None
+            or producer in self.producer_products_cache
+        )
+        
+    def schedule_producers(self, inventory_df):
+        """Order producers, and the SKUs within each, by check priority
+        
+        A producer's score (see PRIORITY_WEIGHTS) mixes its share of the
+        available stock, the share of its SKUs with no known URL and
+        whether its listing still has to be loaded. Returns a list of
+        (producer, producer_df) pairs.
+        """
+        import pandas as pd
+        df = inventory_df[inventory_df['Producer'] != "UNKNOWN"]
+        if df.empty:
+            return []
+        known_skus = set(self.sku_url_mapping) | set(self.learned_urls)
+        df = df.assign(
+            _available=df['Available'].fillna(0).clip(lower=0).astype('int64'),
+            _never_checked=~df['SKU'].isin(known_skus)
+        )
+        
+        per_producer = df.groupby('Producer', observed=True).agg(
+            available=('_available', 'sum'),
+            never_checked=('_never_checked', 'mean')
+        )
+        total_available = per_producer['available'].sum()
+        stale = pd.Series(
+            [0.0 if self.has_fresh_listing(producer) else 1.0 for producer in per_producer.index],
+            index=per_producer.index
+        )
+        scores = (
+            PRIORITY_WEIGHTS['available'] * (per_producer['available'] / total_available if total_available else 0)
+            + PRIORITY_WEIGHTS['never_checked'] * per_producer['never_checked']
+            + PRIORITY_WEIGHTS['stale'] * stale
+        ).sort_values(ascending=False, kind='stable')
+        
+        # Within a producer, SKUs without a known URL and with the most stock go first
+        groups = {producer: group for producer, group in df.groupby('Producer', observed=True)}
+        schedule = []
+        for producer in scores.index:
+            group = groups[producer].sort_values(['_never_checked', '_available'], ascending=False, kind='stable')
+            schedule.append((producer, group.drop(columns=['_available', '_never_checked'])))
+            
+        print("Check order: " + ", ".join(f"{producer} ({score:.2f})" for producer, score in scores.head(5).items())
+              + (", ..." if len(scores) > 5 else ""))
+        return schedule
+        
+    def profile_stage(self, name):
+        """Profile a stage of the run if profiling is on"""
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler.stage(name)
+        
+    def finish_profile(self):
+        """Save the stage profiles in a folder named after the report"""
+        if self.profiler is None or not self.profiler.stages:
+            return
+        if self.output_file:
+            directory = f"{os.path.splitext(self.output_file)[0]}_profile"
+        else:
+            directory = f"inventory_profile_{self.current_date}"
+        try:
+            paths = self.profiler.save(directory)
+            print(f"\nProfiles saved to {directory} ({len(paths)} files)")
+        except OSError as e:
+            print(f"Error saving profiles: {e}")
+        self.profiler = None
+        
+    def record_run(self, started, result):
+        """Count a finished run and write the metrics file if requested"""
+        self.metrics.inc('inventory_runs_total', result=result)
+        self.metrics.set('inventory_last_run_duration_seconds', time.perf_counter() - started)
+        self.metrics.set('inventory_last_run_timestamp_seconds', time.time())
+        if self.metrics_path:
+            try:
+                self.metrics.save(self.metrics_path)
+                print(f"Metrics saved to {self.metrics_path}")
+            except OSError as e:
+                print(f"Error saving metrics: {e}")
+                
+    def record_history(self, pdf_path, inventory_df):
+        """Add this run's per-SKU results to the history database"""
+        if not self.history_path:
+            return
+        import sqlite3
+        from inventory_history import ResultsHistory
+        try:
+            with ResultsHistory(self.history_path) as history:
+                run_id = history.record_run(
+                    inventory_df, os.path.abspath(pdf_path), self.output_file, self.match_methods, self.fetch_times
+                )
+            print(f"Results added to {self.history_path} (run {run_id})")
+        except (sqlite3.Error, OSError) as e:
+            print(f"Error saving results history: {e}")
+            
+    def finish_trace(self):
+        """Print the timing summary and save the trace file if requested"""
+        self.tracer.print_summary()
+        if self.trace_path:
+            try:
+                self.tracer.save(self.trace_path)
+                print(f"\nTrace saved to {self.trace_path} (open in Perfetto or chrome://tracing)")
+            except Exception as e:
+                print(f"Error saving trace: {e}")
                 
     def process_producer_products(self, inventory_df, producer_df, website_products, used_urls, products_checked, products_total):
-        """Process all products for a producer"""
+        """Process all products for a producer
+        
+        SKUs with a mapped or predicted URL are checked first. The rest
+        are then matched to the producer's remaining website products
+        together (see match_website_products).
+        """
+        unmatched = []
+        done = products_checked
         for index, row in producer_df.iterrows():
+            if self.is_cancelled() or self.deadline_reached():
+                return
+                
             sku = row['SKU']
             product_name = row['Product']
             
+            # Restore SKUs completed before an interruption
+            if sku in self.resumed_rows:
+                for key, value in self.resumed_rows[sku].items():
+                    inventory_df.at[index, key] = value
+                if sku in self.resumed_methods:
+                    self.match_methods[sku] = self.resumed_methods[sku]
+                if self.resumed_rows[sku].get('Product URL'):
+                    used_urls.add(self.resumed_rows[sku]['Product URL'])
+                inventory_df.at[index, 'Check Status'] = 'Checked'
+                done += 1
+                self.report_progress(done, products_total, row['Producer'])
+                continue
+            
             # Skip specific SKU that should be excluded entirely
             if sku == 'S1EDGGCSM20':
                 print(f"Skipping SKU {sku} as per configuration")
+                inventory_df.at[index, 'Check Status'] = 'Excluded'
+                done += 1
                 continue
                 
             # Try direct SKU mapping first
@@ -901,26 +2502,60 @@ class InventoryChecker:
                 # Special case for products that should NOT be matched
                 if product_url == 'NO_MATCH':
                     print(f"SKU {sku} intentionally excluded from website matching")
+                    inventory_df.at[index, 'Check Status'] = 'Excluded'
+                    done += 1
                     continue
                     
                 self.process_mapped_product(inventory_df, index, sku, product_name, product_url, used_urls)
+                method = 'mapping'
             else:
                 # Try to predict URL from patterns
-                predicted_url = self.predict_url_from_pattern(sku)
+                predicted_url = self.predict_url_from_pattern(sku, row, used_urls=used_urls)
                 if predicted_url:
                     print(f"Using pattern-predicted URL for {sku}: {predicted_url}")
                     self.process_mapped_product(inventory_df, index, sku, product_name, predicted_url, used_urls)
+                    method = 'pattern'
                 else:
-                    # Try to find a matching product on the website
-                    self.find_matching_product(inventory_df, index, sku, row, product_name, website_products, used_urls)
+                    # Matched against the website listing once the mapped SKUs have taken their URLs
+                    unmatched.append((index, row))
+                    continue
+            done += 1
+            self.finish_product(inventory_df, index, row, method, done, products_total)
+            
+        if not unmatched or self.is_cancelled() or self.deadline_reached():
+            return
+        matches = self.match_website_products(unmatched, website_products, used_urls)
+        for index, row in unmatched:
+            if self.is_cancelled() or self.deadline_reached():
+                return
+            self.find_matching_product(inventory_df, index, row['SKU'], row['Product'], matches.get(index), used_urls)
+            done += 1
+            self.finish_product(inventory_df, index, row, 'fuzzy' if index in matches else 'none', done, products_total)
             
-            # Report progress through callback if available
-            if self.progress_callback:
-                self.progress_callback(products_checked + index - producer_df.index[0] + 1, products_total, producer_df.iloc[0]['Producer'])
+    def finish_product(self, inventory_df, index, row, method, done, products_total):
+        """Mark a checked SKU, journal its results and report progress"""
+        sku = row['SKU']
+        self.metrics.inc('inventory_matches_total', method=method)
+        self.match_methods[sku] = method
+        inventory_df.at[index, 'Check Status'] = 'Checked'
+        
+        self.write_checkpoint({
+            'type': 'sku',
+            'sku': sku,
+            'values': {
+                key: str(inventory_df.at[index, key]) if key == 'Product URL' else bool(inventory_df.at[index, key])
+                for key in RESULT_COLUMNS
+            },
+            'method': method
+        })
+        
+        # Report progress (polled by the GUI, and passed to the callback if set)
+        self.report_progress(done, products_total, row['Producer'])
     
     def process_mapped_product(self, inventory_df, index, sku, product_name, product_url, used_urls):
         """Process a product with a known URL mapping"""
         print(f"Using URL mapping for {sku}: {product_url}")
+        product_url = self.resolve_url(product_url)
         used_urls.add(product_url)
         
         results = self.check_product_details(product_url)
@@ -934,32 +2569,62 @@ class InventoryChecker:
         inventory_df.at[index, 'Product URL'] = product_url
         inventory_df.at[index, 'Varietal Mismatch'] = has_varietal_mismatch
     
-    def find_matching_product(self, inventory_df, index, sku, row, product_name, website_products, used_urls):
-        """Find a matching product on the website"""
-        best_match = None
-        best_match_score = 0
-        
-        for web_product in website_products:
-            web_name = web_product['name'].lower()
-            inv_name = product_name.lower()
-            
-            # Calculate simple matching score
-            words_in_inv = set(inv_name.split())
-            words_in_web = set(web_name.split())
-            common_words = words_in_inv.intersection(words_in_web)
-            score = len(common_words) / max(len(words_in_inv), len(words_in_web))
-            
-            # Consider vintage if available
-            if row['Vintage'] and row['Vintage'] != 'N/V':
-                if row['Vintage'] in web_product['name']:
-                    score += 0.3  # Boost score if vintage matches
-            
-            if score > best_match_score:
-                best_match_score = score
-                best_match = web_product
-        
-        # If we found a reasonable match
-        if best_match and best_match_score > 0.3:
+    def match_website_products(self, rows, website_products, used_urls):
+        """Match unmapped SKUs to a producer's website products, one page per SKU
+        
+        A pair's score is the share of the longer name's words the two
+        names have in common, plus VINTAGE_BONUS if the website name
+        contains the SKU's vintage. All pairs are scored as one NumPy
+        matrix product, and the assignment with the highest total score
+        is chosen, so two SKUs never claim the same page. Pages already
+        used by a mapped SKU are not offered. Returns {index: (product, score)}
+        for pairs scoring above MATCH_THRESHOLD.
+        """
+        import numpy as np
+        products = [product for product in website_products if product['url'] not in used_urls]
+        if not rows or not products:
+            return {}
+            
+        row_words = [set(row['Product'].lower().split()) for _, row in rows]
+        product_words = [set(product['name'].lower().split()) for product in products]
+        vocabulary = {word: column for column, word in enumerate(set().union(*row_words, *product_words))}
+        
+        def incidence(word_sets):
+            matrix = np.zeros((len(word_sets), len(vocabulary)))
+            for position, words in enumerate(word_sets):
+                matrix[position, [vocabulary[word] for word in words]] = 1
+            return matrix
+            
+        row_matrix = incidence(row_words)
+        product_matrix = incidence(product_words)
+        common = row_matrix @ product_matrix.T
+        longer = np.maximum.outer(row_matrix.sum(axis=1), product_matrix.sum(axis=1))
+        scores = np.divide(common, longer, out=np.zeros_like(common), where=longer > 0)
+        
+        vintages = [str(row['Vintage']) for _, row in rows]
+        for vintage in set(vintages):
+            if vintage and vintage != 'N/V':
+                with_vintage = np.array([vintage in product['name'] for product in products])
+                scores[np.ix_(np.array(vintages) == vintage, with_vintage)] += VINTAGE_BONUS
+                
+        # Pairs below the threshold are no better than leaving the SKU unmatched
+        scores[scores <= MATCH_THRESHOLD] = 0
+        size = max(scores.shape)
+        square = np.zeros((size, size))
+        square[:scores.shape[0], :scores.shape[1]] = scores
+        columns = solve_assignment(-square)
+        
+        matches = {}
+        for position, (index, _) in enumerate(rows):
+            column = columns[position]
+            if column < len(products) and scores[position, column] > 0:
+                matches[index] = (products[column], float(scores[position, column]))
+        return matches
+        
+    def find_matching_product(self, inventory_df, index, sku, product_name, match, used_urls):
+        """Check the website product matched to a SKU, if it got one"""
+        if match:
+            best_match, best_match_score = match
             print(f"Match found for {sku} - {product_name}: {best_match['name']} (Score: {best_match_score:.2f})")
             used_urls.add(best_match['url'])
             
@@ -980,11 +2645,13 @@ class InventoryChecker:
     
     def find_website_only_products(self, all_website_products, used_urls):
         """Find products that are on the website but not in inventory"""
+        import pandas as pd
         website_only_products = []
+        mapped_urls = {self.resolve_url(url) for url in self.sku_url_mapping.values() if url and url != 'NO_MATCH'}
         
         for producer, products in all_website_products.items():
             for product in products:
-                if product['url'] not in used_urls and product['url'] not in self.sku_url_mapping.values():
+                if product['url'] not in used_urls and product['url'] not in mapped_urls:
                     website_only_products.append({
                         'Producer': producer,
                         'Product': product['name'],
@@ -997,15 +2664,172 @@ class InventoryChecker:
         else:
             return pd.DataFrame(columns=['Producer', 'Product', 'Product URL'])
     
-    def generate_excel_report(self, inventory_df, website_only_df):
+    def process_batch(self, pdf_paths):
+        """Process several inventory PDFs sharing one browser and page cache
+        
+        Writes one report per PDF plus a consolidated cross-warehouse report.
+        """
+        print(f"\nProcessing {len(pdf_paths)} inventory files...")
+        current_date = datetime.now().strftime('%m%d%y')
+        inventories = {}
+        website_only = {}
+        
+        self.keep_driver_open = True
+        try:
+            for pdf_path in pdf_paths:
+                warehouse = os.path.splitext(os.path.basename(pdf_path))[0]
+                print(f"\n{'=' * 50}\n{warehouse}\n{'=' * 50}")
+                if self.process_inventory(pdf_path, f'inventory_report_{warehouse}_{current_date}.xlsx'):
+                    inventories[warehouse] = self.last_inventory_df
+                    website_only[warehouse] = self.last_website_only_df
+                if self.is_cancelled():
+                    break
+        finally:
+            self.keep_driver_open = False
+            self.close_driver()
+            
+        if not inventories:
+            print("\nNo inventory files were processed successfully.")
+            return False
+            
+        print(f"\nChecked {len(self.product_details_cache)} unique product pages for {len(inventories)} inventories.")
+        return self.generate_consolidated_report(inventories, website_only, f'inventory_report_consolidated_{current_date}.xlsx')
+        
+    def clear_page_cache(self):
+        """Forget loaded producer listings and product pages"""
+        self.producer_products_cache = {}
+        self.product_details_cache = {}
+        self.learned_urls = {}
+        self.cache_started = time.time()
+        
+    def watch_folder(self, inbox, outbox, poll_interval=5, cache_ttl=3600):
+        """Process every PDF that lands in inbox, keeping the browser and caches warm
+        
+        Reports are written to outbox and each processed PDF is moved to
+        inbox/processed (or inbox/failed). Page caches are dropped after
+        cache_ttl seconds so long-running watches still see site changes.
+        """
+        processed_dir = os.path.join(inbox, 'processed')
+        failed_dir = os.path.join(inbox, 'failed')
+        for directory in (outbox, processed_dir, failed_dir):
+            os.makedirs(directory, exist_ok=True)
+            
+        print(f"\nWatching {inbox} for inventory PDFs (reports go to {outbox}). Press Ctrl+C to stop.")
+        self.keep_driver_open = True
+        if self.driver is None and self.snapshot is None:
+            self.setup_selenium()
+            
+        # Only pick up files whose size has stopped changing (the ERP may still be writing)
+        pending_sizes = {}
+        # Files that could not be moved out of the inbox are not processed again
+        stuck = set()
+        try:
+            while not self.is_cancelled():
+                for name in sorted(os.listdir(inbox)):
+                    path = os.path.join(inbox, name)
+                    if not name.lower().endswith('.pdf') or not os.path.isfile(path) or path in stuck:
+                        continue
+                        
+                    try:
+                        size = os.path.getsize(path)
+                    except OSError:
+                        continue  # Removed since the listing
+                    if pending_sizes.get(path) != size:
+                        pending_sizes[path] = size
+                        continue
+                    del pending_sizes[path]
+                    
+                    if time.time() - self.cache_started > cache_ttl:
+                        print("\nPage cache expired, reloading pages from the website")
+                        self.clear_page_cache()
+                        
+                    warehouse = os.path.splitext(name)[0]
+                    output_file = os.path.join(outbox, f"inventory_report_{warehouse}_{datetime.now().strftime('%m%d%y')}.xlsx")
+                    started = time.perf_counter()
+                    try:
+                        success = self.process_inventory(path, output_file)
+                    except Exception as e:
+                        print(f"Error processing {name}: {e}")
+                        success = False
+                    if self.is_cancelled():
+                        break
+                        
+                    target_dir = processed_dir if success else failed_dir
+                    # Keep earlier copies of the same file name
+                    base, extension = os.path.splitext(name)
+                    target = os.path.join(target_dir, name)
+                    i = 2
+                    while os.path.exists(target):
+                        target = os.path.join(target_dir, f"{base}_{i}{extension}")
+                        i += 1
+                    try:
+                        shutil.move(path, target)
+                    except OSError as e:
+                        print(f"Could not move {name} to {target_dir}, it will not be processed again: {e}")
+                        stuck.add(path)
+                    print(f"\n{'Finished' if success else 'Failed'} {name} in {time.perf_counter() - started:.1f}s")
+                    
+                self.cancel_event.wait(poll_interval)
+        finally:
+            self.keep_driver_open = False
+            self.close_driver()
+            
+    def generate_consolidated_report(self, inventories, website_only, output_file):
+        """Generate one report comparing all warehouses of a batch"""
+        import pandas as pd
+        print("\nGenerating consolidated report...")
+        try:
+            all_inventory_df = pd.concat(
+                [df.assign(Warehouse=warehouse) for warehouse, df in inventories.items()],
+                ignore_index=True
+            )
+            
+            # One row per SKU with its website results and stock in each warehouse
+            sku_columns = ['SKU', 'Vintage', 'Producer', 'Product'] + RESULT_COLUMNS + ['Check Status']
+            cross_df = all_inventory_df.drop_duplicates('SKU')[sku_columns].set_index('SKU')
+            stock_df = all_inventory_df.pivot_table(
+                index='SKU', columns='Warehouse', values='Available', aggfunc='first'
+            )
+            stock_df.columns = [f"Available ({warehouse})" for warehouse in stock_df.columns]
+            cross_df = cross_df.join(stock_df)
+            cross_df['Warehouses'] = all_inventory_df.groupby('SKU')['Warehouse'].nunique()
+            cross_df = cross_df.reset_index().sort_values(['Producer', 'SKU'])
+            
+            # Website products missing from every warehouse
+            website_only_sets = [set(df['Product URL']) for df in website_only.values()]
+            missing_everywhere = set.intersection(*website_only_sets) if website_only_sets else set()
+            website_only_df = pd.concat(list(website_only.values()), ignore_index=True)
+            website_only_df = website_only_df[website_only_df['Product URL'].isin(missing_everywhere)].drop_duplicates('Product URL')
+            
+            with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
+                cross_df.to_excel(writer, sheet_name='Cross-Warehouse', index=False)
+                all_inventory_df.to_excel(writer, sheet_name='All Inventory', index=False)
+                website_only_df.to_excel(writer, sheet_name='Website Only Products', index=False)
+                build_stock_summary(all_inventory_df).to_excel(writer, sheet_name='Stock Summary', index=False)
+                self.apply_conditional_formatting(writer.sheets['Cross-Warehouse'], cross_df)
+                
+            self.output_file = os.path.abspath(output_file)
+            print(f"\nConsolidated results saved to {output_file}")
+            print(f"- Cross-Warehouse: {len(cross_df)} SKUs across {len(inventories)} warehouses")
+            print(f"- Website Only Products: {len(website_only_df)} products")
+            return True
+            
+        except Exception as e:
+            print(f"Error generating consolidated report: {e}")
+            return False
+            
+    def generate_excel_report(self, inventory_df, website_only_df, output_file=None):
         """Generate Excel report with all results"""
+        import pandas as pd
         print("\nGenerating Excel report...")
         try:
             # Sort the inventory DataFrame
             inventory_df = inventory_df.sort_values(['Producer', 'SKU'])
+            stock_summary_df = build_stock_summary(inventory_df)
             
             # Save results to Excel with multiple sheets
-            output_file = f'inventory_report_{self.current_date}.xlsx'
+            if output_file is None:
+                output_file = f'inventory_report_{self.current_date}.xlsx'
             i = 1
             while True:
                 try:
@@ -1014,14 +2838,18 @@ class InventoryChecker:
                     with pd.ExcelWriter(current_file, engine='openpyxl') as writer:
                         inventory_df.to_excel(writer, sheet_name='Inventory Report', index=False)
                         website_only_df.to_excel(writer, sheet_name='Website Only Products', index=False)
+                        stock_summary_df.to_excel(writer, sheet_name='Stock Summary', index=False)
                         
                         # Format Inventory Report sheet
                         inventory_sheet = writer.sheets['Inventory Report']
-                        self.apply_conditional_formatting(inventory_sheet, inventory_df)
+                        with self.tracer.span('apply_conditional_formatting'):
+                            self.apply_conditional_formatting(inventory_sheet, inventory_df)
                         
+                    self.output_file = os.path.abspath(current_file)
                     print(f"\nResults saved to {current_file}")
                     print(f"- Inventory Report: {len(inventory_df)} products")
                     print(f"- Website Only Products: {len(website_only_df)} products")
+                    print(f"- Stock Summary: {stock_summary_df['Available Not On Website'].sum()} available units not on the website")
                     break
                 except PermissionError:
                     i += 1
@@ -1034,13 +2862,10 @@ class InventoryChecker:
         except Exception as e:
             print(f"Error generating report: {e}")
             return False
-            
-        finally:
-            if self.driver:
-                self.driver.quit()
                 
     def apply_conditional_formatting(self, worksheet, df):
         """Apply conditional formatting to highlight issues"""
+        from openpyxl.styles import PatternFill
         # Define fill colors
         red_fill = PatternFill(start_color="FFFF0000", end_color="FFFF0000", fill_type="solid")
         yellow_fill = PatternFill(start_color="FFFFFF00", end_color="FFFFFF00", fill_type="solid")
@@ -1048,30 +2873,190 @@ class InventoryChecker:
         # Get column indices
         on_website_col = df.columns.get_loc('On Website') + 1  # +1 because Excel is 1-indexed
         varietal_mismatch_col = df.columns.get_loc('Varietal Mismatch') + 1
+        stock_issue_col = df.columns.get_loc('Stock Issue') + 1 if 'Stock Issue' in df.columns else None
+        check_status_col = df.columns.get_loc('Check Status') + 1 if 'Check Status' in df.columns else None
         
         # Apply conditional formatting
         for row in range(2, len(df) + 2):  # +2 because Excel is 1-indexed and has a header row
+            # Products not checked before the deadline (website status unknown)
+            if check_status_col and df.iloc[row-2]['Check Status'] == 'Not checked':
+                worksheet.cell(row=row, column=check_status_col).fill = yellow_fill
+                
             # Products not on website (missing)
-            if not df.iloc[row-2]['On Website']:
+            elif not df.iloc[row-2]['On Website']:
                 worksheet.cell(row=row, column=on_website_col).fill = red_fill
                 
             # Products with varietal mismatch
             if df.iloc[row-2].get('Varietal Mismatch', False):
                 worksheet.cell(row=row, column=varietal_mismatch_col).fill = yellow_fill
+                
+            # Stock values that could not be read from the PDF
+            if stock_issue_col and df.iloc[row-2]['Stock Issue']:
+                worksheet.cell(row=row, column=stock_issue_col).fill = yellow_fill
+
+# Checker attributes copied into each worker process
+SHARD_STATE = [
+    'base_url', 'sku_url_mapping', 'url_patterns', 'slug_vocabulary', 'learned_urls', 'snapshot',
+    'fast_mode', 'listing_refresh', 'listings_path', 'redirects', 'redirects_path',
+    'deadline', 'deadline_reserve', 'resumed_rows', 'resumed_producers', 'resumed_url_results',
+    'resumed_methods'
+]
+
+# The checker owned by this worker process (see init_shard_worker)
+_shard_checker = None
+
+def init_shard_worker(state, trace_origin, stop_event):
+    """Process pool initializer: one checker, and so one browser, per worker"""
+    global _shard_checker
+    import multiprocessing.util
+    checker = InventoryChecker()
+    for name, value in state.items():
+        setattr(checker, name, value)
+    checker.tracer.origin = trace_origin
+    checker.cancel_event = stop_event
+    checker.keep_driver_open = True
+    multiprocessing.util.Finalize(checker, checker.close_driver, exitpriority=10)
+    _shard_checker = checker
+
+def check_producer_shard(producer, producer_df):
+    """Check one producer in a worker process and return everything the parent merges"""
+    checker = _shard_checker
+    checker.journal_buffer = []
+    checker.fetch_stats = Counter()
+    checker.tracer.events = []
+    checker.redirects_changed = False
+    checker.listings_changed = False
+    checker.metrics = Metrics()
+    checker.match_methods = {}
+    checker.fetch_times = {}
+    learned_before = set(checker.learned_urls)
+    
+    inventory_df = producer_df.copy()
+    used_urls = set()
+    website_products = None
+    if not checker.is_cancelled() and not checker.deadline_reached():
+        website_products = checker.check_producer(inventory_df, producer, producer_df, used_urls, 0, len(producer_df))
+        
+    return {
+        'producer': producer,
+        'rows': len(producer_df),
+        'website_products': website_products,
+        'results': inventory_df[RESULT_COLUMNS + ['Check Status']],
+        'used_urls': used_urls,
+        'journal': checker.journal_buffer,
+        'fetch_stats': checker.fetch_stats,
+        'match_methods': checker.match_methods,
+        'fetch_times': checker.fetch_times,
+        'learned_urls': {sku: url for sku, url in checker.learned_urls.items() if sku not in learned_before},
+        'redirects': dict(checker.redirects) if checker.redirects_changed else {},
+        'listings': {producer: checker.saved_listings[producer]} if checker.listings_changed else {},
+        'trace_events': checker.tracer.events,
+        'metrics': checker.metrics.snapshot()
+    }
+
+def find_pdf_files(paths):
+    """Expand directories in a list of paths into the PDF files they contain"""
+    pdf_paths = []
+    for path in paths:
+        if os.path.isdir(path):
+            pdf_paths.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.lower().endswith('.pdf')
+            ))
+        else:
+            pdf_paths.append(path)
+    return pdf_paths
 
 def main():
     parser = argparse.ArgumentParser(description='Process inventory PDF and check website')
-    parser.add_argument('pdf_path', help='Path to the inventory PDF file')
+    parser.add_argument('pdf_paths', nargs='*', metavar='pdf_path', help='Inventory PDF files, or directories of PDFs (several are processed as one batch)')
+    parser.add_argument('--snapshot', metavar='ARCHIVE', help='Crawl the whole catalog into a compressed snapshot archive')
+    parser.add_argument('--from-snapshot', metavar='ARCHIVE', help='Check against a snapshot archive instead of the live website')
+    parser.add_argument('--trace', action='store_true', help='Save a Chrome trace-event timing file of each run')
+    parser.add_argument('--trace-path', default='trace.json', metavar='PATH', help='Where --trace saves the timing file')
+    parser.add_argument('--metrics', action='store_true', help='Write Prometheus metrics after each run')
+    parser.add_argument('--metrics-path', default='metrics.prom', metavar='PATH', help='Where --metrics writes the metrics')
+    parser.add_argument('--metrics-port', type=int, metavar='PORT', help='Serve Prometheus metrics on this port while --watch runs')
+    parser.add_argument('--profile', action='store_true', help='Save cProfile and collapsed-stack profiles of each stage next to the report')
+    parser.add_argument('--history-db', default='inventory_history.sqlite', metavar='PATH', help='SQLite database each run adds its per-SKU results to (query with inventory_history.py)')
+    parser.add_argument('--no-history', action='store_true', help='Do not add the results to the history database')
+    parser.add_argument('--resume', action='store_true', help='Continue an interrupted run from its checkpoint file')
+    parser.add_argument('--watch', metavar='INBOX', help='Keep running and process every PDF that lands in INBOX')
+    parser.add_argument('--outbox', metavar='DIR', help='Where --watch writes reports (default: INBOX/reports)')
+    parser.add_argument('--poll-interval', type=float, default=5, help='Seconds between inbox scans in --watch mode')
+    parser.add_argument('--cache-ttl', type=float, default=60, help='Minutes before --watch reloads cached pages')
+    parser.add_argument('--fast', action='store_true', help='Only crawl producers with unmapped SKUs; use saved listings for the others')
+    parser.add_argument('--listing-refresh', type=float, default=24, metavar='HOURS', help='Age after which --fast crawls a saved listing again')
+    parser.add_argument('--processes', type=int, default=1, metavar='N', help='Check producers in N worker processes, each with its own browser')
+    parser.add_argument('--deadline', type=parse_deadline, metavar='HH:MM', help="Write the report by this time (or in +MINUTES), marking unfinished SKUs 'Not checked'")
     args = parser.parse_args()
+    if args.deadline and args.watch:
+        # A deadline is one point in time, so every file after it would be left unchecked
+        parser.error('--deadline cannot be used with --watch')
     
-    if not os.path.exists(args.pdf_path):
-        print(f"Error: File not found: {args.pdf_path}")
+    checker = InventoryChecker()
+    checker.trace_path = args.trace_path if args.trace else None
+    checker.metrics_path = args.metrics_path if args.metrics else None
+    checker.history_path = None if args.no_history else args.history_db
+    checker.profile = args.profile
+    checker.resume = args.resume
+    checker.deadline = args.deadline
+    checker.fast_mode = args.fast
+    checker.processes = max(1, args.processes)
+    checker.listing_refresh = args.listing_refresh * 3600
+    
+    if args.snapshot:
+        checker.create_snapshot(args.snapshot)
         return
         
-    checker = InventoryChecker()
-    checker.process_inventory(args.pdf_path)
+    if args.from_snapshot:
+        if not os.path.exists(args.from_snapshot):
+            print(f"Error: Snapshot not found: {args.from_snapshot}")
+            return
+        checker.load_snapshot(args.from_snapshot)
+        
+    if args.watch:
+        if not os.path.isdir(args.watch):
+            print(f"Error: Inbox directory not found: {args.watch}")
+            return
+        if args.metrics_port:
+            serve_metrics(checker.metrics, args.metrics_port)
+        try:
+            checker.watch_folder(
+                args.watch,
+                args.outbox or os.path.join(args.watch, 'reports'),
+                poll_interval=args.poll_interval,
+                cache_ttl=args.cache_ttl * 60
+            )
+        except KeyboardInterrupt:
+            checker.close_checkpoint(completed=False)
+            print("\nStopped watching.")
+        return
+        
+    if not args.pdf_paths:
+        parser.error('pdf_path is required unless --snapshot or --watch is given')
+        
+    pdf_paths = find_pdf_files(args.pdf_paths)
+    for pdf_path in pdf_paths:
+        if not os.path.exists(pdf_path):
+            print(f"Error: File not found: {pdf_path}")
+            return
+    if not pdf_paths:
+        print("Error: No PDF files found")
+        return
+        
+    try:
+        if len(pdf_paths) == 1 and not os.path.isdir(args.pdf_paths[0]):
+            checker.process_inventory(pdf_paths[0])
+        else:
+            checker.process_batch(pdf_paths)
+    except KeyboardInterrupt:
+        checker.close_checkpoint(completed=False)
 
 if __name__ == "__main__":
+    import multiprocessing
+    # Worker processes of a PyInstaller build start by running the exe again
+    multiprocessing.freeze_support()
     main() 
 
 # python inventory_checker.py "C:\Users\warwi\OneDrive\Desktop\itswarwick\Starz Updater\D916818--A.pdf"
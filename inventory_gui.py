@@ -1,16 +1,18 @@
+import time
+STARTUP_STARTED = time.perf_counter()  # Measured before any other import for the startup report
+
 import os
 import sys
+import json
 import threading
 import tkinter as tk
 from tkinter import filedialog, ttk
 from tkinter.scrolledtext import ScrolledText
 import customtkinter as ctk  # More modern UI components
-from inventory_checker import InventoryChecker
 from datetime import datetime
-import io
+import queue
 import contextlib
 import base64
-from PIL import Image, ImageTk
 from io import BytesIO
 
 # App icon as base64 string (wine bottle icon)
@@ -22,25 +24,114 @@ iVBORw0KGgoAAAANSUhEUgAAAEAAAABACAYAAACqaXHeAAAACXBIWXMAAAsTAAALEwEAmpwYAAANTklE
 ctk.set_appearance_mode("Dark")  # Modes: "System", "Dark", "Light"
 ctk.set_default_color_theme("blue")  # Themes: "blue", "green", "dark-blue"
 
+# Modules that should only be loaded once processing starts (see report_startup_time)
+HEAVY_MODULES = ['pandas', 'pdfplumber', 'selenium', 'webdriver_manager', 'openpyxl', 'requests']
+
+# How often the progress bar samples the checker while processing
+PROGRESS_FPS = 10
+
+# Seconds to wait for a cancelled check to close its browser when the window is closed
+CLOSE_TIMEOUT = 15
+
+# Share of the progress bar given to each checker stage (start %, end %)
+STAGE_RANGES = {
+    'Idle': (0, 0),
+    'Reading PDF': (0, 5),
+    'Setting up browser': (5, 10),
+    'Checking products': (10, 90),
+    'Creating report': (90, 99),
+    'Complete': (100, 100),
+    'Failed': (100, 100),
+    'Cancelled': (0, 0)
+}
+
 class RedirectText:
-    """Class to redirect stdout to ScrolledText widget"""
-    def __init__(self, text_widget):
+    """Class to redirect stdout to ScrolledText widget
+    
+    Writes can come from any thread; they are queued and the Tk main loop
+    drains them in batches, keeping only the last max_lines lines in the
+    widget. The full log is spilled to a file between set_log_file() and
+    close_log_file().
+    """
+    def __init__(self, text_widget, max_lines=2000, interval=100, batch_size=1000):
         self.text_widget = text_widget
-        self.buffer = io.StringIO()
+        self.max_lines = max_lines
+        self.interval = interval  # Milliseconds between drains
+        self.batch_size = batch_size  # Writes handled per drain
+        self.queue = queue.Queue()
+        self.log_file = None
+        self.line_count = 0
+        self.text_widget.after(self.interval, self.drain)
 
     def write(self, string):
-        self.buffer.write(string)
-        self.text_widget.configure(state=tk.NORMAL)
-        self.text_widget.insert(tk.END, string)
-        self.text_widget.see(tk.END)
-        self.text_widget.configure(state=tk.DISABLED)
+        self.queue.put(string)
         
     def flush(self):
         pass
+        
+    def set_log_file(self, path):
+        """Append the full log to a file from now on"""
+        if self.log_file:
+            self.log_file.close()
+        self.log_file = open(path, 'a', encoding='utf-8')
+        
+    def close_log_file(self):
+        """Write out whatever is still queued and close the log file (call from the Tk thread)"""
+        if not self.log_file:
+            return
+        while not self.queue.empty():
+            self.drain(reschedule=False)
+        self.log_file.close()
+        self.log_file = None
+        
+    def clear(self):
+        """Remove everything from the widget (call from the Tk thread)"""
+        self.text_widget.configure(state=tk.NORMAL)
+        self.text_widget.delete("1.0", tk.END)
+        self.text_widget.configure(state=tk.DISABLED)
+        self.line_count = 0
+        
+    def drain(self, reschedule=True):
+        """Move queued writes into the widget in one batch (runs on the Tk thread)"""
+        chunks = []
+        try:
+            while len(chunks) < self.batch_size:
+                chunks.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+            
+        if chunks:
+            text = ''.join(chunks)
+            if self.log_file:
+                self.log_file.write(text)
+                self.log_file.flush()
+                
+            self.text_widget.configure(state=tk.NORMAL)
+            self.text_widget.insert(tk.END, text)
+            
+            # Drop the oldest lines once the widget holds more than max_lines
+            self.line_count += text.count('\n')
+            if self.line_count > self.max_lines:
+                excess = self.line_count - self.max_lines
+                self.text_widget.delete("1.0", f"{excess + 1}.0")
+                self.line_count = self.max_lines
+                
+            self.text_widget.see(tk.END)
+            self.text_widget.configure(state=tk.DISABLED)
+            
+        if not reschedule:
+            return
+        # Come back sooner if writes are still waiting
+        delay = 10 if not self.queue.empty() else self.interval
+        try:
+            self.text_widget.after(delay, self.drain)
+        except tk.TclError:
+            pass  # Widget destroyed
 
 class InventoryCheckerGUI(ctk.CTk):
-    def __init__(self):
+    def __init__(self, startup_check=False):
         super().__init__()
+        self.startup_check = startup_check  # Report startup time and close
         
         # Configure window
         self.title("Southern Starz Inventory Checker")
@@ -54,7 +145,10 @@ class InventoryCheckerGUI(ctk.CTk):
         self.pdf_path = None
         self.output_file = None
         self.processing = False
-        self.progress_queue = []  # Queue for progress updates
+        self.checker = None  # Checker of the current run, polled for progress
+        self.worker = None  # Thread running the current check
+        self.closing = False
+        self.run_result = None  # (success, excel_path, error) set by the worker thread
         
         # Create main container with padding
         self.main_container = ctk.CTkFrame(self, fg_color="transparent")
@@ -62,6 +156,29 @@ class InventoryCheckerGUI(ctk.CTk):
         
         # Create UI elements
         self.create_ui()
+        
+        # Stop a running check cleanly when the window is closed
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Runs as soon as the main loop shows the window
+        self.after(0, self.report_startup_time)
+        
+    def report_startup_time(self):
+        """Report the time from launch to the first window, and any heavy modules loaded early"""
+        self.update_idletasks()
+        elapsed = time.perf_counter() - STARTUP_STARTED
+        heavy_loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+        
+        print(f"Ready in {elapsed:.2f}s")
+        if heavy_loaded:
+            print(f"Warning: loaded before processing started: {', '.join(heavy_loaded)}")
+            
+        if self.startup_check:
+            # stdout is redirected to the log widget, so write to the real console
+            report = {'time_to_window': elapsed, 'heavy_modules_loaded': heavy_loaded}
+            sys.__stdout__.write(f"STARTUP {json.dumps(report)}\n")
+            sys.__stdout__.flush()
+            self.destroy()
     
     def set_app_icon(self):
         """Set the application icon with robust error handling"""
@@ -182,7 +299,36 @@ class InventoryCheckerGUI(ctk.CTk):
             state=tk.DISABLED,
             command=self.download_excel
         )
-        self.download_btn.pack(side=tk.LEFT)
+        self.download_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # Cancel button (enabled while processing)
+        self.cancel_btn = ctk.CTkButton(
+            action_container, 
+            text="Cancel",
+            height=38,
+            font=ctk.CTkFont(weight="bold"),
+            state=tk.DISABLED,
+            command=self.cancel_processing
+        )
+        self.cancel_btn.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # Resume option for runs that were interrupted
+        self.resume_var = tk.BooleanVar(value=False)
+        resume_check = ctk.CTkCheckBox(
+            action_container,
+            text="Resume interrupted run",
+            variable=self.resume_var
+        )
+        resume_check.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # Save per-stage profiles next to the report
+        self.profile_var = tk.BooleanVar(value=False)
+        profile_check = ctk.CTkCheckBox(
+            action_container,
+            text="Profile run",
+            variable=self.profile_var
+        )
+        profile_check.pack(side=tk.LEFT)
         
         # Status and progress on the right
         status_container = ctk.CTkFrame(action_container, fg_color="transparent")
@@ -282,8 +428,36 @@ class InventoryCheckerGUI(ctk.CTk):
             self.progress_status.configure(text=message)
             self.status_label.configure(text=message)  # Update the top status too
             
-        # Update UI immediately
-        self.update_idletasks()
+    def describe_progress(self, event):
+        """Turn a checker progress snapshot into a percentage and status message"""
+        start, end = STAGE_RANGES.get(event['stage'], (0, 100))
+        percentage = start
+        if event['total']:
+            percentage += (end - start) * min(1.0, event['done'] / event['total'])
+            
+        message = f"{event['stage']}..."
+        if event['stage'] == 'Checking products':
+            message = f"Checking {event['producer'] or 'products'} ({event['done']}/{event['total']}"
+            if event['urls_per_sec']:
+                message += f", {event['urls_per_sec']:.1f} URLs/s"
+            if event['eta'] is not None:
+                minutes, seconds = divmod(int(event['eta']), 60)
+                message += f", ETA {minutes}:{seconds:02d}"
+            message += ")"
+        return percentage, message
+        
+    def poll_progress(self):
+        """Sample the checker's progress on the Tk thread at a fixed frame rate"""
+        if self.run_result is not None:
+            self.finish_processing(*self.run_result)
+            return
+            
+        if self.checker is not None:
+            event = self.checker.progress.snapshot()
+            if event['stage'] != 'Idle':
+                self.update_progress(*self.describe_progress(event))
+                
+        self.after(int(1000 / PROGRESS_FPS), self.poll_progress)
     
     def browse_file(self):
         """Open file dialog to select PDF file"""
@@ -315,143 +489,140 @@ class InventoryCheckerGUI(ctk.CTk):
         # Reset progress
         self.update_progress(0, "Starting...")
         
-        # Start processing thread
-        threading.Thread(target=self._process_thread, daemon=True).start()
+        # Clear log and spill the full log for this run to a file
+        self.text_redirect.clear()
+        try:
+            self.text_redirect.set_log_file(f"inventory_log_{datetime.now().strftime('%m%d%y')}.txt")
+        except Exception as e:
+            print(f"Could not open log file: {e}")
+        
+        # Start processing thread and sample its progress from the Tk thread
+        # (the checker and its dependencies are only imported at this point)
+        from inventory_checker import InventoryChecker
+        self.checker = InventoryChecker()
+        self.checker.resume = self.resume_var.get()
+        self.checker.profile = self.profile_var.get()
+        self.run_result = None
+        self.cancel_btn.configure(state=tk.NORMAL)
+        self.worker = threading.Thread(target=self._process_thread, daemon=True)
+        self.worker.start()
+        self.poll_progress()
+    
+    def cancel_processing(self):
+        """Ask the running check to stop after the current page"""
+        if self.processing and self.checker:
+            self.checker.cancel()
+            self.cancel_btn.configure(state=tk.DISABLED)
+            self.status_label.configure(text="Cancelling...")
+            
+    def on_close(self):
+        """Cancel any running check (keeping its checkpoint) and close the window once it has stopped"""
+        if self.closing:
+            return
+        if self.worker and self.worker.is_alive():
+            self.closing = True
+            self.checker.cancel()
+            self.cancel_btn.configure(state=tk.DISABLED)
+            self.status_label.configure(text="Closing after the browser has shut down...")
+            self.wait_for_worker(time.monotonic() + CLOSE_TIMEOUT)
+            return
+        self.text_redirect.close_log_file()
+        self.destroy()
+        
+    def wait_for_worker(self, give_up):
+        """Close the window once the cancelled check has finished, or at give_up"""
+        if self.worker.is_alive() and time.monotonic() < give_up:
+            self.after(100, self.wait_for_worker, give_up)
+            return
+        if self.worker.is_alive():
+            # Still stuck in a page load, so quit the browser from here
+            self.checker.close_driver()
+        self.text_redirect.close_log_file()
+        self.destroy()
+    
+    def find_excel_report(self, checker):
+        """Find the generated Excel file if the checker did not record its path"""
+        date_string = checker.current_date if hasattr(checker, 'current_date') else datetime.now().strftime('%m%d%y')
+        possible_locations = [
+            os.path.dirname(os.path.abspath(self.pdf_path)),  # PDF directory
+            os.getcwd(),  # Current working directory
+            os.path.dirname(os.path.abspath(__file__))  # Script directory
+        ]
+        
+        # Look for the Excel file in each possible location
+        for location in possible_locations:
+            path = os.path.join(location, f'inventory_report_{date_string}.xlsx')
+            if os.path.exists(path):
+                return path
+        
+        # If not found, try numbered versions
+        for location in possible_locations:
+            for i in range(1, 11):
+                path = os.path.join(location, f'inventory_report_{date_string}_{i}.xlsx')
+                if os.path.exists(path):
+                    return path
+                    
+        print("❌ Error: Excel file not found. Searched in:")
+        for location in possible_locations:
+            print(f"  - {location}")
+        return None
     
     def _process_thread(self):
-        """Background thread for processing inventory"""
+        """Background thread for processing inventory
+        
+        Widgets are only touched from the Tk thread: this thread prints to the
+        log queue and leaves its result in self.run_result for poll_progress.
+        """
+        success = False
+        excel_path = None
+        error = None
         try:
-            # Clear log
-            self.log_text.configure(state=tk.NORMAL)
-            self.log_text.delete("1.0", tk.END)
-            self.log_text.configure(state=tk.DISABLED)
-            
-            # Reset progress bar
-            self.update_progress(0, "Starting...")
-            
             print(f"Starting inventory check at {datetime.now().strftime('%H:%M:%S')}")
             print(f"Processing PDF: {self.pdf_path}")
             print("-" * 50)
             
-            # Extract data from PDF
-            self.update_progress(2, "Reading PDF file...")
-            checker = InventoryChecker()
-            df = checker.extract_pdf_data(self.pdf_path)
-            if df is None or df.empty:
-                raise Exception("No data extracted from PDF")
-            
-            print(f"\nFound {len(df)} products in PDF")
-            
-            # Setup Selenium and prepare for web access - Stage 1 begins (0-15%)
-            self.update_progress(5, "Setting up web browser...")
-            checker.setup_selenium()
-            
-            # Get all unique producers
-            unique_producers = df['Producer'].unique()
-            producers = [p for p in unique_producers if p != "UNKNOWN"]
-            products_total = len(df[df['Producer'] != "UNKNOWN"])
-            
-            # Get all producer web products first (this is the "finding links" stage)
-            all_website_products = {}
-            for idx, producer in enumerate(producers):
-                # Calculate progress for stage 1 (0-15%)
-                progress_pct = 5 + int((idx / len(producers)) * 10)  # 5-15% range
-                self.update_progress(progress_pct, f"Finding products for {producer}...")
-                print(f"\nProcessing {producer}...")
-                
-                # Get producer products
-                website_products = checker.get_producer_products(producer)
-                all_website_products[producer] = website_products
-                
-            # Stage 2: Checking marketing assets (16-85%)
-            self.update_progress(15, "Checking marketing assets...")
-            
-            # Add a progress callback to track progress during the asset checking phase
-            def progress_callback(current, total, producer=None):
-                if total > 0:
-                    # Calculate progress within stage 2 (15-85%, so 70% range)
-                    stage_progress = (current / total) * 70
-                    # Add the base progress from stage 1 (15%)
-                    overall_progress = 15 + stage_progress
-                    
-                    message = f"Checking assets ({int(overall_progress)}%)"
-                    if producer:
-                        message = f"Checking {producer} products..."
-                    
-                    self.update_progress(overall_progress, message)
-            
-            # Pass the callback to the inventory checker to provide progress updates
-            checker.set_progress_callback(progress_callback)
-            
-            # Run the actual process_inventory method which will check marketing assets
+            # Run the full check; progress is sampled by poll_progress
+            checker = self.checker
             success = checker.process_inventory(self.pdf_path)
             
             if not success:
-                self.update_progress(85, "Processing failed")
-                print(f"❌ Processing failed")
-                self.status_label.configure(text="Processing failed")
+                if checker.is_cancelled():
+                    print("⏹ Processing cancelled. Tick 'Resume interrupted run' to continue later.")
+                else:
+                    print("❌ Processing failed")
                 return
                 
-            # Stage 3: Creating report (86-100%)
-            self.update_progress(85, "Creating Excel report...")
-            
-            # Find the generated Excel file
-            date_string = checker.current_date if hasattr(checker, 'current_date') else datetime.now().strftime('%m%d%y')
-            possible_locations = [
-                os.path.dirname(os.path.abspath(self.pdf_path)),  # PDF directory
-                os.getcwd(),  # Current working directory
-                os.path.dirname(os.path.abspath(__file__))  # Script directory
-            ]
-            
-            # Update progress as we format and save the Excel file
-            self.update_progress(93, "Formatting Excel report...")
-            
-            # Look for the Excel file in each possible location
-            excel_path = None
-            for location in possible_locations:
-                base_file = f'inventory_report_{date_string}.xlsx'
-                path = os.path.join(location, base_file)
-                if os.path.exists(path):
-                    excel_path = path
-                    self.update_progress(98, "Excel file created")
-                    break
-            
-            # If not found, try numbered versions
-            if not excel_path:
-                self.update_progress(95, "Searching for generated file...")
-                for location in possible_locations:
-                    for i in range(1, 11):
-                        numbered_file = f'inventory_report_{date_string}_{i}.xlsx'
-                        path = os.path.join(location, numbered_file)
-                        if os.path.exists(path):
-                            excel_path = path
-                            self.update_progress(98, "Excel file created")
-                            break
-                    if excel_path:
-                        break
-            
-            # Final progress update - 100%
+            excel_path = checker.output_file or self.find_excel_report(checker)
             if excel_path:
-                self.update_progress(100, "Processing complete!")
-                self.output_file = excel_path
                 print("-" * 50)
                 print(f"✅ Process complete! Excel report generated at:")
                 print(f"{excel_path}")
-                self.status_label.configure(text="Processing complete!")
-                self.download_btn.configure(state=tk.NORMAL)
-            else:
-                self.update_progress(100, "Excel file not found")
-                print("-" * 50)
-                print(f"❌ Error: Excel file not found. Searched in:")
-                for loc in possible_locations:
-                    print(f"  - {loc}")
         
         except Exception as e:
-            self.update_progress(100, f"Error: {str(e)}")
+            error = str(e)
             print(f"❌ Error: {str(e)}")
         finally:
-            self.processing = False
-            self.process_btn.configure(state=tk.NORMAL)
+            self.run_result = (success, excel_path, error)
+            
+    def finish_processing(self, success, excel_path, error):
+        """Update widgets once the worker thread is done (runs on the Tk thread)"""
+        if error:
+            self.update_progress(100, f"Error: {error}")
+        elif not success and self.checker.is_cancelled():
+            self.update_progress(0, "Cancelled")
+        elif not success:
+            self.update_progress(100, "Processing failed")
+        elif excel_path:
+            self.update_progress(100, "Processing complete!")
+            self.output_file = excel_path
+            self.download_btn.configure(state=tk.NORMAL)
+        else:
+            self.update_progress(100, "Excel file not found")
+            
+        self.processing = False
+        self.process_btn.configure(state=tk.NORMAL)
+        self.cancel_btn.configure(state=tk.DISABLED)
+        self.text_redirect.close_log_file()
             
     def download_excel(self):
         """Open the generated Excel file"""
@@ -479,7 +650,7 @@ class InventoryCheckerGUI(ctk.CTk):
 def main():
     try:
         # Create the application
-        app = InventoryCheckerGUI()
+        app = InventoryCheckerGUI(startup_check='--startup-check' in sys.argv[1:])
         app.mainloop()
     except Exception as e:
         print(f"Error starting application: {str(e)}")
@@ -535,6 +706,7 @@ def main():
                 # Run in separate thread to avoid freezing UI
                 def run_process():
                     try:
+                        from inventory_checker import InventoryChecker
                         checker = InventoryChecker()
                         checker.process_inventory(pdf_path[0])
                         root.after(0, lambda: status_label.config(text="Complete! Check for Excel file in the same folder."))
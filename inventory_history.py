@@ -0,0 +1,293 @@
+import sys
+import sqlite3
+import argparse
+from datetime import datetime, timedelta
+
+from inventory_checker import ASSET_COLUMNS, STOCK_COLUMNS
+
+# Report columns stored for every SKU of every run, and their database names
+HISTORY_COLUMNS = {
+    'SKU': 'sku',
+    'Vintage': 'vintage',
+    'Producer': 'producer',
+    'Product': 'product',
+    'On Hand': 'on_hand',
+    'On Order': 'on_order',
+    'Available': 'available',
+    'Check Status': 'check_status',
+    'On Website': 'on_website',
+    'Has Spec Sheet': 'has_spec_sheet',
+    'Has Shelf-Talker': 'has_shelf_talker',
+    'Has Hi-Res Label': 'has_hi_res_label',
+    'Has Bottle Shot': 'has_bottle_shot',
+    'Varietal Mismatch': 'varietal_mismatch',
+    'Product URL': 'product_url',
+}
+
+# Website results compared by the changes query
+TRACKED_COLUMNS = ['on_website'] + [HISTORY_COLUMNS[column] for column in ASSET_COLUMNS] + ['varietal_mismatch', 'product_url']
+
+# Names accepted for --asset
+ASSET_NAMES = {
+    'spec-sheet': 'has_spec_sheet',
+    'shelf-talker': 'has_shelf_talker',
+    'hi-res-label': 'has_hi_res_label',
+    'bottle-shot': 'has_bottle_shot',
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id INTEGER PRIMARY KEY,
+    run_date TEXT NOT NULL,
+    pdf TEXT,
+    report TEXT,
+    skus INTEGER
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (run_id),
+    run_date TEXT NOT NULL,
+    sku TEXT NOT NULL,
+    vintage TEXT,
+    producer TEXT,
+    product TEXT,
+    on_hand INTEGER,
+    on_order INTEGER,
+    available INTEGER,
+    check_status TEXT,
+    on_website INTEGER,
+    has_spec_sheet INTEGER,
+    has_shelf_talker INTEGER,
+    has_hi_res_label INTEGER,
+    has_bottle_shot INTEGER,
+    varietal_mismatch INTEGER,
+    product_url TEXT,
+    match_method TEXT,
+    fetch_seconds REAL
+);
+CREATE INDEX IF NOT EXISTS results_sku ON results (sku, run_date);
+CREATE INDEX IF NOT EXISTS results_url ON results (product_url, run_date);
+CREATE INDEX IF NOT EXISTS results_date ON results (run_date);
+"""
+
+
+def parse_since(text):
+    """Start date for queries: YYYY-MM-DD, a weekday name (the last one before today) or N days ago ('7d')"""
+    text = text.strip().lower()
+    today = datetime.now().date()
+    weekdays = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+    if text in weekdays:
+        days = (today.weekday() - weekdays.index(text)) % 7 or 7
+        return (today - timedelta(days=days)).isoformat()
+    if text.endswith('d') and text[:-1].isdigit():
+        return (today - timedelta(days=int(text[:-1]))).isoformat()
+    try:
+        return datetime.strptime(text, '%Y-%m-%d').date().isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, a weekday name or a number of days like 7d, not '{text}'")
+
+
+class ResultsHistory:
+    """Per-SKU results of every run in a SQLite database
+
+    Each run adds one row per inventory SKU with its stock, website and
+    asset flags, matched URL, how the URL was found and how long its page
+    took to load. Rows are indexed by SKU, URL and run date so questions
+    about earlier runs never need the old Excel reports.
+    """
+    def __init__(self, path='inventory_history.sqlite'):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.connection.close()
+
+    def record_run(self, inventory_df, pdf_path=None, report_path=None, match_methods=None, fetch_times=None, run_date=None):
+        """Add a run's inventory results and return its run id"""
+        import pandas as pd
+        match_methods = match_methods or {}
+        fetch_times = fetch_times or {}
+        run_date = run_date or datetime.now().isoformat(timespec='seconds')
+        columns = list(HISTORY_COLUMNS)
+
+        def value(column, item):
+            if pd.isna(item):
+                return None
+            if column in STOCK_COLUMNS:
+                return int(item)
+            if isinstance(item, str):
+                return item
+            if column in ('SKU', 'Vintage', 'Producer', 'Product'):
+                return str(item)
+            return int(bool(item))
+
+        rows = []
+        for record in inventory_df[columns].itertuples(index=False, name=None):
+            values = [value(column, item) for column, item in zip(columns, record)]
+            sku, url = values[0], values[-1] or None
+            values[-1] = url
+            rows.append([run_date] + values + [match_methods.get(sku), fetch_times.get(url)])
+
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (run_date, pdf, report, skus) VALUES (?, ?, ?, ?)",
+                (run_date, pdf_path, report_path, len(rows))
+            )
+            run_id = cursor.lastrowid
+            names = ', '.join(['run_id', 'run_date'] + list(HISTORY_COLUMNS.values()) + ['match_method', 'fetch_seconds'])
+            placeholders = ', '.join('?' * (len(columns) + 4))
+            self.connection.executemany(
+                f"INSERT INTO results ({names}) VALUES ({placeholders})",
+                ([run_id] + row for row in rows)
+            )
+        return run_id
+
+    def runs(self, limit=20):
+        return self.connection.execute(
+            "SELECT run_id, run_date, pdf, report, skus FROM runs ORDER BY run_date DESC, run_id DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+
+    def latest_results(self, before=None, since=None):
+        """Each SKU's most recent checked result before or since a date"""
+        condition = "run_date < ?" if before else "run_date >= ?"
+        rows = self.connection.execute(
+            f"""SELECT * FROM (
+                    SELECT *, ROW_NUMBER() OVER (PARTITION BY sku ORDER BY run_date DESC, run_id DESC) AS position
+                    FROM results WHERE check_status = 'Checked' AND {condition}
+                ) WHERE position = 1""",
+            (before or since,)
+        ).fetchall()
+        return {row['sku']: row for row in rows}
+
+    def changes_since(self, since):
+        """Website and asset changes between each SKU's last result before a date and its latest one
+
+        Returns (sku, producer, product, change) tuples. SKUs checked for
+        the first time since the date are listed as new.
+        """
+        before = self.latest_results(before=since)
+        after = self.latest_results(since=since)
+        changes = []
+        for sku, now in sorted(after.items()):
+            then = before.get(sku)
+            if then is None:
+                changes.append((sku, now['producer'], now['product'], 'new SKU'))
+                continue
+            differences = []
+            for column in TRACKED_COLUMNS:
+                if then[column] == now[column]:
+                    continue
+                if column == 'product_url':
+                    differences.append(f"URL {then[column] or '-'} -> {now[column] or '-'}")
+                else:
+                    name = column.replace('has_', '').replace('_', ' ')
+                    differences.append(f"{name} {'added' if now[column] else 'lost'}")
+            if differences:
+                changes.append((sku, now['producer'], now['product'], ', '.join(differences)))
+        return changes
+
+    def missing_asset(self, column, weeks, now=None):
+        """SKUs on the website whose latest checks have all lacked an asset for a number of weeks
+
+        Only SKUs whose latest check falls within those weeks and found
+        the page without the asset are listed, so SKUs that have since
+        left the website or the inventory drop out. The missing period
+        starts at the first check without the asset after the last check
+        that had it. Returns rows with sku, producer, product,
+        missing_since and last_checked.
+        """
+        if column not in ASSET_NAMES.values():
+            raise ValueError(f"Unknown asset column: {column}")
+        cutoff = ((now or datetime.now()) - timedelta(weeks=weeks)).isoformat(timespec='seconds')
+        return self.connection.execute(
+            f"""SELECT * FROM (
+                    SELECT l.sku, l.producer, l.product, l.run_date AS last_checked,
+                           (SELECT MIN(r.run_date) FROM results AS r
+                            WHERE r.sku = l.sku AND r.check_status = 'Checked' AND r.on_website = 1 AND r.{column} = 0
+                              AND r.run_date > COALESCE(
+                                  (SELECT MAX(p.run_date) FROM results AS p
+                                   WHERE p.sku = l.sku AND p.check_status = 'Checked' AND p.{column} = 1), '')
+                           ) AS missing_since
+                    FROM (
+                        SELECT *, ROW_NUMBER() OVER (PARTITION BY sku ORDER BY run_date DESC, run_id DESC) AS position
+                        FROM results WHERE check_status = 'Checked'
+                    ) AS l
+                    WHERE l.position = 1 AND l.on_website = 1 AND l.{column} = 0 AND l.run_date >= ?
+                )
+                WHERE missing_since <= ?
+                ORDER BY missing_since, sku""",
+            (cutoff, cutoff)
+        ).fetchall()
+
+    def sku_history(self, sku):
+        return self.connection.execute(
+            "SELECT * FROM results WHERE sku = ? ORDER BY run_date, run_id",
+            (sku,)
+        ).fetchall()
+
+
+def print_table(headers, rows):
+    """Print rows as plain aligned columns"""
+    rows = [['' if item is None else str(item) for item in row] for row in rows]
+    widths = [max([len(header)] + [len(row[position]) for row in rows]) for position, header in enumerate(headers)]
+    print('  '.join(header.ljust(width) for header, width in zip(headers, widths)).rstrip())
+    for row in rows:
+        print('  '.join(item.ljust(width) for item, width in zip(row, widths)).rstrip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the results history of earlier inventory runs')
+    parser.add_argument('--db', default='inventory_history.sqlite', help='History database written by inventory_checker.py')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    runs = commands.add_parser('runs', help='List recent runs')
+    runs.add_argument('--limit', type=int, default=20)
+
+    changes = commands.add_parser('changes', help='Website and asset changes since a date')
+    changes.add_argument('--since', type=parse_since, required=True, help='YYYY-MM-DD, a weekday name (monday) or a number of days (7d)')
+
+    missing = commands.add_parser('missing', help='SKUs missing an asset for a number of weeks')
+    missing.add_argument('--asset', choices=sorted(ASSET_NAMES), default='spec-sheet')
+    missing.add_argument('--weeks', type=float, default=3)
+
+    sku = commands.add_parser('sku', help='Every recorded result of one SKU')
+    sku.add_argument('sku')
+    args = parser.parse_args()
+
+    with ResultsHistory(args.db) as history:
+        if args.command == 'runs':
+            print_table(['Run', 'Date', 'SKUs', 'PDF', 'Report'], [
+                (row['run_id'], row['run_date'], row['skus'], row['pdf'], row['report'])
+                for row in history.runs(args.limit)
+            ])
+        elif args.command == 'changes':
+            rows = history.changes_since(args.since)
+            print(f"{len(rows)} SKUs changed since {args.since}\n")
+            print_table(['SKU', 'Producer', 'Product', 'Change'], rows)
+        elif args.command == 'missing':
+            rows = history.missing_asset(ASSET_NAMES[args.asset], args.weeks)
+            print(f"{len(rows)} SKUs without a {args.asset} for {args.weeks:g}+ weeks\n")
+            print_table(['SKU', 'Producer', 'Product', 'Missing since', 'Last checked'], [
+                (row['sku'], row['producer'], row['product'], row['missing_since'][:10], row['last_checked'][:10])
+                for row in rows
+            ])
+        else:
+            print_table(['Date', 'Status', 'Available', 'On Website', 'Spec', 'Shelf', 'Label', 'Bottle', 'Method', 'Fetch s', 'URL'], [
+                (row['run_date'], row['check_status'], row['available'], row['on_website'], row['has_spec_sheet'],
+                 row['has_shelf_talker'], row['has_hi_res_label'], row['has_bottle_shot'], row['match_method'],
+                 None if row['fetch_seconds'] is None else f"{row['fetch_seconds']:.2f}", row['product_url'])
+                for row in history.sku_history(args.sku)
+            ])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+import os
+import re
+import sys
+import json
+import uuid
+import queue
+import shutil
+import argparse
+import threading
+import time
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from inventory_checker import InventoryChecker, Metrics
+
+
+class JobService:
+    """Queue of inventory jobs processed by a bounded pool of warm checkers
+
+    Each worker thread owns one InventoryChecker (and so one browser), but
+    all workers share the producer listing, product page and learned URL
+    caches, so a page loaded for one job is reused by every later job, and
+    a page two jobs need at the same time is only loaded once. The caches
+    are replaced by empty ones cache_ttl seconds after they were started,
+    so the service still sees website changes.
+    """
+    def __init__(self, jobs_dir='service_jobs', workers=2, queue_size=20, configure_checker=None, cache_ttl=3600):
+        self.jobs_dir = jobs_dir
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.configure_checker = configure_checker
+        self.producer_products_cache = {}
+        self.product_details_cache = {}
+        self.learned_urls = {}
+        self.cache_ttl = cache_ttl
+        self.cache_started = time.time()
+        self.inflight = {}
+        self.inflight_lock = threading.Lock()
+        self.metrics = Metrics()
+        self.checkers = []
+        self.workers = []
+        os.makedirs(jobs_dir, exist_ok=True)
+
+        for number in range(workers):
+            worker = threading.Thread(target=self.worker_loop, name=f"worker-{number + 1}", daemon=True)
+            worker.start()
+            self.workers.append(worker)
+
+    def make_checker(self):
+        """Create a checker that shares this service's caches"""
+        checker = InventoryChecker()
+        checker.keep_driver_open = True
+        self.share_caches(checker)
+        checker.inflight = self.inflight
+        checker.inflight_lock = self.inflight_lock
+        checker.metrics = self.metrics
+        if self.configure_checker:
+            self.configure_checker(checker)
+        with self.lock:
+            self.checkers.append(checker)
+        return checker
+
+    def expire_caches(self):
+        """Start new, empty shared caches once the current ones are older than cache_ttl
+        
+        Jobs already running keep the old dicts until they finish, so a
+        cache is never emptied while a worker is reading it.
+        """
+        with self.lock:
+            if time.time() - self.cache_started <= self.cache_ttl:
+                return
+            self.cache_started = time.time()
+            self.producer_products_cache = {}
+            self.product_details_cache = {}
+            self.learned_urls = {}
+        print("\nPage cache expired, reloading pages from the website")
+
+    def share_caches(self, checker):
+        """Point a checker at the service's current shared caches"""
+        with self.lock:
+            checker.producer_products_cache = self.producer_products_cache
+            checker.product_details_cache = self.product_details_cache
+            checker.learned_urls = self.learned_urls
+
+    def shutdown(self):
+        """Stop running jobs and close every worker's browser"""
+        with self.lock:
+            checkers = list(self.checkers)
+        for checker in checkers:
+            checker.cancel()
+            checker.close_driver()
+
+    def submit(self, filename, pdf_data):
+        """Store an uploaded PDF and queue it; returns the job, or None if the queue is full"""
+        job_id = uuid.uuid4().hex[:12]
+        job_dir = os.path.join(self.jobs_dir, job_id)
+        os.makedirs(job_dir)
+
+        # Keep the original name (it becomes the warehouse name in the report)
+        safe_name = re.sub(r'[^A-Za-z0-9._-]', '_', os.path.basename(filename or 'inventory.pdf'))
+        if not safe_name.lower().endswith('.pdf'):
+            safe_name += '.pdf'
+        pdf_path = os.path.join(job_dir, safe_name)
+        with open(pdf_path, 'wb') as f:
+            f.write(pdf_data)
+
+        job = {
+            'id': job_id,
+            'filename': safe_name,
+            'status': 'queued',
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'started': None,
+            'finished': None,
+            'error': None,
+            'pdf_path': pdf_path,
+            'report_path': None,
+            'result_path': None,
+            'checker': None
+        }
+        with self.lock:
+            self.jobs[job_id] = job
+        try:
+            self.queue.put_nowait(job_id)
+        except queue.Full:
+            with self.lock:
+                del self.jobs[job_id]
+            shutil.rmtree(job_dir, ignore_errors=True)
+            return None
+        return job
+
+    def cancel(self, job_id):
+        """Cancel a queued job or ask a running one to stop after its current fetch"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if not job:
+                return None
+            if job['status'] == 'queued':
+                job['status'] = 'cancelled'
+            elif job['status'] == 'running' and job['checker']:
+                job['checker'].cancel()
+            return job
+
+    def describe(self, job):
+        """Public view of a job, including live progress while it runs"""
+        info = {key: job[key] for key in ('id', 'filename', 'status', 'created', 'started', 'finished', 'error')}
+        if job['checker'] is not None and job['status'] == 'running':
+            info['progress'] = job['checker'].progress.snapshot()
+        if job['report_path']:
+            info['report'] = f"/jobs/{job['id']}/report.xlsx"
+        if job['result_path']:
+            info['result'] = f"/jobs/{job['id']}/result.json"
+        return info
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list_jobs(self):
+        with self.lock:
+            return [self.describe(job) for job in self.jobs.values()]
+
+    def worker_loop(self):
+        checker = self.make_checker()
+        while True:
+            job_id = self.queue.get()
+            with self.lock:
+                job = self.jobs.get(job_id)
+                if not job or job['status'] == 'cancelled':
+                    continue
+                job['status'] = 'running'
+                job['started'] = datetime.now().isoformat(timespec='seconds')
+                job['checker'] = checker
+            self.expire_caches()
+            self.share_caches(checker)
+            self.run_job(checker, job)
+
+    def run_job(self, checker, job):
+        job_dir = os.path.dirname(job['pdf_path'])
+        warehouse = os.path.splitext(job['filename'])[0]
+        output_file = os.path.join(job_dir, f"inventory_report_{warehouse}_{datetime.now().strftime('%m%d%y')}.xlsx")
+        checker.checkpoint_dir = job_dir
+
+        status = 'failed'
+        error = None
+        try:
+            if checker.process_inventory(job['pdf_path'], output_file):
+                result_path = os.path.join(job_dir, 'result.json')
+                with open(result_path, 'w') as f:
+                    json.dump({
+                        'inventory': json.loads(checker.last_inventory_df.to_json(orient='records')),
+                        'website_only': json.loads(checker.last_website_only_df.to_json(orient='records'))
+                    }, f)
+                with self.lock:
+                    job['report_path'] = checker.output_file
+                    job['result_path'] = result_path
+                status = 'done'
+            elif checker.is_cancelled():
+                status = 'cancelled'
+        except Exception as e:
+            error = str(e)
+            print(f"Error in job {job['id']}: {e}")
+
+        with self.lock:
+            job['status'] = status
+            job['error'] = error
+            job['finished'] = datetime.now().isoformat(timespec='seconds')
+            job['checker'] = None
+
+
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        def send_json(self, status, data):
+            payload = json.dumps(data, indent=2).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def send_file(self, path, content_type):
+            with open(path, 'rb') as f:
+                payload = f.read()
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(payload)))
+            self.send_header('Content-Disposition', f'attachment; filename="{os.path.basename(path)}"')
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def route(self):
+            """Split the path into parts and look up the job it refers to"""
+            parts = [part for part in urlparse(self.path).path.split('/') if part]
+            job = service.get(parts[1]) if len(parts) >= 2 and parts[0] == 'jobs' else None
+            return parts, job
+
+        def do_POST(self):
+            parts, _ = self.route()
+            if parts != ['jobs']:
+                return self.send_json(404, {'error': 'Not found'})
+
+            length = int(self.headers.get('Content-Length') or 0)
+            if not length:
+                return self.send_json(400, {'error': 'Send the PDF file as the request body'})
+            pdf_data = self.rfile.read(length)
+            if not pdf_data.startswith(b'%PDF'):
+                return self.send_json(400, {'error': 'Request body is not a PDF file'})
+
+            name = parse_qs(urlparse(self.path).query).get('name', ['inventory.pdf'])[0]
+            job = service.submit(name, pdf_data)
+            if job is None:
+                return self.send_json(503, {'error': 'Job queue is full, try again later'})
+            self.send_json(202, service.describe(job))
+
+        def send_metrics(self):
+            payload = service.metrics.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            parts, job = self.route()
+            if parts == ['metrics']:
+                return self.send_metrics()
+            if parts == ['jobs']:
+                return self.send_json(200, service.list_jobs())
+            if not job:
+                return self.send_json(404, {'error': 'Not found'})
+
+            if len(parts) == 2:
+                return self.send_json(200, service.describe(job))
+            if parts[2:] == ['report.xlsx'] and job['report_path']:
+                return self.send_file(job['report_path'], 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+            if parts[2:] == ['result.json'] and job['result_path']:
+                return self.send_file(job['result_path'], 'application/json')
+            self.send_json(404, {'error': f"Not available (job is {job['status']})"})
+
+        def do_DELETE(self):
+            parts, job = self.route()
+            if not job or len(parts) != 2:
+                return self.send_json(404, {'error': 'Not found'})
+            self.send_json(200, service.describe(service.cancel(job['id'])))
+
+        def log_message(self, format, *args):
+            print(f"[service] {self.address_string()} {format % args}")
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the inventory checker as a local HTTP job service')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8080, help='Port to listen on')
+    parser.add_argument('--workers', type=int, default=2, help='Jobs processed at the same time (one browser each)')
+    parser.add_argument('--queue-size', type=int, default=20, help='Maximum number of waiting jobs')
+    parser.add_argument('--jobs-dir', default='service_jobs', help='Where uploaded PDFs and reports are kept')
+    parser.add_argument('--cache-ttl', type=float, default=60, help='Minutes before cached pages are loaded again')
+    parser.add_argument('--from-snapshot', metavar='ARCHIVE', help='Check against a snapshot archive instead of the live website')
+    parser.add_argument('--stand-in', action='store_true', help='Check against the local stand-in site from benchmark.py')
+    args = parser.parse_args()
+
+    snapshot = None
+    if args.from_snapshot:
+        loader = InventoryChecker()
+        loader.load_snapshot(args.from_snapshot)
+        snapshot = loader.snapshot
+
+    site = None
+    if args.stand_in:
+        from benchmark import StandInSite
+        site = StandInSite()
+        print(f"Stand-in site running at {site.start()}")
+
+    def configure_checker(checker):
+        if snapshot is not None:
+            checker.snapshot = snapshot
+        if site is not None:
+            site.point_checker(checker)
+
+    service = JobService(args.jobs_dir, args.workers, args.queue_size, configure_checker, args.cache_ttl * 60)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service))
+    server.daemon_threads = True
+    print(f"Inventory service listening on http://{args.host}:{args.port} with {args.workers} workers")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        if site is not None:
+            site.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+pytest.importorskip('pandas')
+pytest.importorskip('pdfplumber')
+
+import benchmark
+from inventory_checker import InventoryChecker
+
+LINES_PER_PAGE = 70
+MAX_GROWTH_MB = 10  # Per 100 pages; keeping every page's layout costs over 1 GB
+
+
+def extract_once(pdf_path):
+    """Extract a PDF in a fresh process, so its peak RSS belongs to that run only"""
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(benchmark.__file__), 'extract-once', str(pdf_path)],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def test_peak_memory_stays_flat_as_pages_grow(tmp_path):
+    checker = InventoryChecker()
+    peaks = {}
+    for pages in (10, 80):
+        pdf_path = tmp_path / f"synthetic_{pages}.pdf"
+        benchmark.write_synthetic_pdf(str(pdf_path), checker, pages, LINES_PER_PAGE)
+        result = extract_once(pdf_path)
+        assert result['rows'] == pages * LINES_PER_PAGE
+        if result['peak_rss_mb'] is None:
+            pytest.skip('peak RSS cannot be read on this platform')
+        peaks[pages] = result['peak_rss_mb']
+
+    growth = (peaks[80] - peaks[10]) / 70 * 100
+    assert growth < MAX_GROWTH_MB, f"peak memory grows by {growth:.1f} MB per 100 pages"
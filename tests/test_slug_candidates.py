@@ -0,0 +1,26 @@
+from inventory_checker import InventoryChecker
+
+
+def make_checker():
+    checker = InventoryChecker()
+    checker.redirects = {}  # No redirect map from earlier runs
+    checker.url_patterns = {'S1ALMMA22': {'templates': ['almarada-malbec-{year}'], 'vintages': ['21']}}
+    return checker
+
+
+def test_description_year_wins_over_sku_digits_that_are_not_a_vintage():
+    # S1ALMMA2275 is a 2022 Malbec; its last two digits are not the vintage
+    row = {'SKU': 'S1ALMMA2275', 'Producer': 'Almarada', 'Full Description': '- 2022 ALMARADA MALBEC 12/750 13.8'}
+    candidates = make_checker().candidate_urls('S1ALMMA2275', row)
+
+    assert candidates
+    assert all(url.endswith('-2022/') for url, _ in candidates)
+    assert all(source == 'slug' for _, source in candidates)
+
+
+def test_sku_vintage_that_agrees_with_the_description_uses_family_templates():
+    row = {'SKU': 'S1ALMMA2223', 'Producer': 'Almarada', 'Full Description': '- 2023 ALMARADA MALBEC 12/750 13.8'}
+    candidates = make_checker().candidate_urls('S1ALMMA2223', row)
+
+    assert candidates[0] == ('https://southernstarz.com/wines/almarada-malbec-2023/', 'template')
+    assert all(url.endswith('-2023/') for url, _ in candidates)